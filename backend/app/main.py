@@ -1,8 +1,22 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 
 from app.routes import generate, rooms
+from app.services import worldslabs
+from app.services.gemini_client import close_http_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_http_client()
+    await worldslabs.close_http_clients()
+
 
-app = FastAPI(title="Instaroom", version="0.1.0")
+app = FastAPI(title="Instaroom", version="0.1.0", lifespan=lifespan)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 app.include_router(generate.router)
 app.include_router(rooms.router)
 
@@ -1,21 +1,36 @@
 """Generation endpoints — start pipeline jobs and poll status."""
 
-from fastapi import APIRouter, File, Form, UploadFile
+from fastapi import APIRouter, File, Form, HTTPException, Response, UploadFile
+
+from app.services.jobs import (
+    Job,
+    JobStatus,
+    find_username_job,
+    get_job,
+    start_username_job,
+)
 
 router = APIRouter(prefix="/api", tags=["generate"])
 
 
 @router.post("/generate", status_code=202)
-async def generate_from_username(username: str):
+async def generate_from_username(username: str, response: Response):
     """Start room generation from an Instagram username.
 
     Deduplication:
     - If a job is already in-progress for this username, returns 200 with existing job_id.
     - If a room is already completed for this username, returns 200 with job_id + room_id.
     """
-    # TODO: check for existing job/room by username
-    # TODO: enqueue pipeline job
-    return {"job_id": "not_implemented", "existing": False}
+    existing = find_username_job(username)
+    if existing is not None:
+        response.status_code = 200
+        body = {"job_id": existing.job_id, "existing": True}
+        if existing.status == JobStatus.COMPLETED and existing.result:
+            body["room_id"] = existing.result.get("room_id")
+        return body
+
+    job = start_username_job(username)
+    return {"job_id": job.job_id, "existing": False}
 
 
 @router.post("/generate/upload", status_code=202)
@@ -29,15 +44,9 @@ async def generate_from_upload(
 
 
 @router.get("/jobs/{job_id}")
-async def get_job_status(job_id: str):
+async def get_job_status(job_id: str) -> Job:
     """Poll job status and progress."""
-    # TODO: look up job state
-    return {
-        "job_id": job_id,
-        "username": None,
-        "status": "not_implemented",
-        "stage": None,
-        "progress": None,
-        "result": None,
-        "error": None,
-    }
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
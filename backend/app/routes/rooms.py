@@ -2,6 +2,8 @@
 
 from fastapi import APIRouter, HTTPException
 
+from app.services.jobs import get_completed_username_job
+
 router = APIRouter(prefix="/api", tags=["rooms"])
 
 
@@ -15,5 +17,7 @@ async def get_room(room_id: str):
 @router.get("/rooms/by-username/{username}")
 async def get_room_by_username(username: str):
     """Get room data by Instagram username. Used for shareable links."""
-    # TODO: look up room by username
-    raise HTTPException(status_code=404, detail="Room not found")
+    job = get_completed_username_job(username)
+    if job is None or not job.result or not job.result.get("room_id"):
+        raise HTTPException(status_code=404, detail="Room not found")
+    return {"username": job.username, **job.result}
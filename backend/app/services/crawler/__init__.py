@@ -1,5 +1,19 @@
 """Stage 0: Instagram data collection via Apify Instagram Scraper."""
 
-from .scraper import Post, Profile, ScrapeResult, scrape_profile
+from .scraper import (
+    Post,
+    Profile,
+    ProfileUnavailableError,
+    ScrapeResult,
+    ScraperRunError,
+    scrape_profile,
+)
 
-__all__ = ["Post", "Profile", "ScrapeResult", "scrape_profile"]
+__all__ = [
+    "Post",
+    "Profile",
+    "ProfileUnavailableError",
+    "ScrapeResult",
+    "ScraperRunError",
+    "scrape_profile",
+]
@@ -6,12 +6,34 @@ Requires APIFY_API_TOKEN environment variable.
 
 from __future__ import annotations
 
+import logging
 import os
 import re
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
 from datetime import datetime
+from itertools import islice
 
-from apify_client import ApifyClient
-from pydantic import BaseModel
+import httpx
+from pydantic import BaseModel, Field, TypeAdapter
+
+from app.services.gemini_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# Default freshness window for cached scrapes (1 day)
+DEFAULT_MAX_AGE_SECONDS = 86400
+
+_RUN_SYNC_URL = (
+    "https://api.apify.com/v2/acts/apify~instagram-scraper/run-sync-get-dataset-items"
+)
+# Apify holds run-sync requests open for at most 300 s
+_RUN_SYNC_TIMEOUT = httpx.Timeout(310.0, connect=10.0)
+
+_MAX_POSTS = 10
+
+_HASHTAG_RE = re.compile(r"#\w+")
 
 
 class Post(BaseModel):
@@ -33,18 +55,80 @@ class Profile(BaseModel):
     post_count: int
 
 
+_POSTS_ADAPTER = TypeAdapter(list[Post])
+
+
+class ScraperRunError(RuntimeError):
+    """The Apify scraper run itself failed.
+
+    ``transient`` is True for network errors, 429 and 5xx responses —
+    failures worth retrying — and False for other HTTP errors.
+    """
+
+    def __init__(self, message: str, *, transient: bool) -> None:
+        super().__init__(message)
+        self.transient = transient
+
+
+class ProfileUnavailableError(RuntimeError):
+    """The profile is private, does not exist, or has no posts."""
+
+
 class ScrapeResult(BaseModel):
     profile: Profile
     posts: list[Post]
+    from_cache: bool = Field(default=False, exclude=True)
+
+
+# ---------------------------------------------------------------------------
+# Result cache
+# ---------------------------------------------------------------------------
+
+# username → (stored_at monotonic seconds, ScrapeResult JSON), least recent first
+_SCRAPE_CACHE_MAX_ENTRIES = 128
+_scrape_cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+
+def _cache_key(username: str) -> str:
+    return username.lstrip("@").lower()
+
+
+def _cache_get(username: str, max_age: int | None) -> ScrapeResult | None:
+    """Return a cached ScrapeResult younger than max_age seconds, if any."""
+    key = _cache_key(username)
+    entry = _scrape_cache.get(key)
+    if entry is None:
+        return None
+    stored_at, payload = entry
+    if max_age is not None and time.monotonic() - stored_at > max_age:
+        _scrape_cache.pop(key, None)
+        return None
+    _scrape_cache.move_to_end(key)
+    result = ScrapeResult.model_validate_json(payload)
+    result.from_cache = True
+    return result
+
+
+def _cache_set(username: str, result: ScrapeResult) -> None:
+    key = _cache_key(username)
+    _scrape_cache[key] = (time.monotonic(), result.model_dump_json())
+    _scrape_cache.move_to_end(key)
+    while len(_scrape_cache) > _SCRAPE_CACHE_MAX_ENTRIES:
+        _scrape_cache.popitem(last=False)
+
+
+def clear_scrape_cache() -> None:
+    """Drop all cached scrape results."""
+    _scrape_cache.clear()
 
 
 def _extract_hashtags(caption: str) -> list[str]:
     """Extract hashtags from a caption string."""
-    return re.findall(r"#\w+", caption)
+    return _HASHTAG_RE.findall(caption)
 
 
-def _parse_post(raw: dict) -> Post:
-    """Map Apify post output to our Post model."""
+def _shape_post(raw: dict) -> dict:
+    """Map Apify post output to Post fields (validated in batch by _POSTS_ADAPTER)."""
     caption = raw.get("caption") or ""
 
     # Handle carousel images: use displayUrl as primary, plus any sidecar images
@@ -54,42 +138,106 @@ def _parse_post(raw: dict) -> Post:
     elif raw.get("displayUrl"):
         image_urls = [raw["displayUrl"]]
 
-    return Post(
-        image_urls=image_urls,
-        video_url=raw.get("videoUrl"),
-        caption=caption,
-        hashtags=raw.get("hashtags") or _extract_hashtags(caption),
-        likes=raw.get("likesCount", 0),
-        date=raw.get("timestamp", datetime.now()),
-        location=raw.get("locationName"),
-        is_video=raw.get("type", "") == "Video",
-    )
+    return {
+        "image_urls": image_urls,
+        "video_url": raw.get("videoUrl"),
+        "caption": caption,
+        "hashtags": raw.get("hashtags") or _extract_hashtags(caption),
+        "likes": raw.get("likesCount", 0),
+        "date": raw.get("timestamp", datetime.now()),
+        "location": raw.get("locationName"),
+        "is_video": raw.get("type", "") == "Video",
+    }
+
+
+def _parse_posts(raw_posts: Iterable[dict]) -> list[Post]:
+    """Map Apify post outputs to Post models in a single validation pass."""
+    return _POSTS_ADAPTER.validate_python([_shape_post(raw) for raw in raw_posts])
 
 
 def _parse_profile(raw: dict) -> Profile:
     """Map Apify profile output to our Profile model."""
-    return Profile(
-        username=raw.get("username", ""),
-        biography=raw.get("biography", ""),
-        profile_pic_url=raw.get("profilePicUrl", ""),
-        follower_count=raw.get("followersCount", 0),
-        post_count=raw.get("postsCount", 0),
-    )
+    return Profile.model_validate({
+        "username": raw.get("username", ""),
+        "biography": raw.get("biography", ""),
+        "profile_pic_url": raw.get("profilePicUrl", ""),
+        "follower_count": raw.get("followersCount", 0),
+        "post_count": raw.get("postsCount", 0),
+    })
+
 
+async def _run_scraper(
+    token: str,
+    profile_url: str,
+    results_type: str,
+    results_limit: int,
+) -> list[dict]:
+    """Run the instagram-scraper actor once and return its dataset items.
 
-def scrape_profile(username: str) -> ScrapeResult:
+    Uses the run-sync-get-dataset-items endpoint, which returns the items
+    in the same response as the run instead of a separate dataset fetch.
+    """
+    try:
+        resp = await get_http_client().post(
+            _RUN_SYNC_URL,
+            headers={"Authorization": f"Bearer {token}"},
+            json={
+                "directUrls": [profile_url],
+                "resultsType": results_type,
+                "resultsLimit": results_limit,
+            },
+            timeout=_RUN_SYNC_TIMEOUT,
+        )
+        resp.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        status = exc.response.status_code
+        raise ScraperRunError(
+            f"Apify scraper run failed ({results_type}): {exc}",
+            transient=status == 429 or status >= 500,
+        ) from exc
+    except httpx.HTTPError as exc:
+        raise ScraperRunError(
+            f"Apify scraper run failed ({results_type}): {exc}",
+            transient=isinstance(exc, httpx.TransportError),
+        ) from exc
+    return resp.json()
+
+
+async def scrape_profile(
+    username: str,
+    *,
+    max_age: int | None = DEFAULT_MAX_AGE_SECONDS,
+    force_fresh: bool = False,
+) -> ScrapeResult:
     """Scrape an Instagram profile's details and 10 most recent posts.
 
+    A single "details" actor run returns both the profile metadata and its
+    latest posts. Results are cached in-process by username, so repeat
+    requests within ``max_age`` seconds skip the Apify run entirely.
+
     Args:
         username: Instagram username (without @).
+        max_age: Maximum age in seconds of a cached result to accept.
+            None accepts any cached result regardless of age.
+        force_fresh: Bypass the cache read and always call Apify
+            (the fresh result is still cached).
 
     Returns:
-        ScrapeResult with profile info and recent posts.
+        ScrapeResult with profile info and recent posts. ``from_cache``
+        is True when the result was served from the cache.
 
     Raises:
         ValueError: If APIFY_API_TOKEN is not set.
-        RuntimeError: If the scraper fails or returns no data.
+        ScraperRunError: If the Apify run fails.
+        ProfileUnavailableError: If the account is private, missing, or
+            has no posts.
     """
+    if not force_fresh:
+        cached = _cache_get(username, max_age)
+        if cached is not None:
+            logger.info("Scrape cache hit for @%s", username)
+            return cached
+
     token = os.environ.get("APIFY_API_TOKEN")
     if not token:
         raise ValueError(
@@ -97,39 +245,27 @@ def scrape_profile(username: str) -> ScrapeResult:
             "Get your token at https://console.apify.com/account/integrations"
         )
 
-    client = ApifyClient(token)
     profile_url = f"https://www.instagram.com/{username}/"
 
-    # Call 1 — Profile details
-    profile_run = client.actor("apify/instagram-scraper").call(run_input={
-        "directUrls": [profile_url],
-        "resultsType": "details",
-        "resultsLimit": 1,
-    })
-    profile_items = list(
-        client.dataset(profile_run["defaultDatasetId"]).iterate_items()
-    )
+    # Single "details" run — returns profile metadata with latestPosts inline
+    profile_items = await _run_scraper(token, profile_url, "details", 1)
+
     if not profile_items:
-        raise RuntimeError(
+        raise ProfileUnavailableError(
             f"No profile data returned for '{username}'. "
             "The account may be private or does not exist."
         )
     profile = _parse_profile(profile_items[0])
 
-    # Call 2 — 10 most recent posts
-    posts_run = client.actor("apify/instagram-scraper").call(run_input={
-        "directUrls": [profile_url],
-        "resultsType": "posts",
-        "resultsLimit": 10,
-    })
-    post_items = list(
-        client.dataset(posts_run["defaultDatasetId"]).iterate_items()
+    posts = _parse_posts(
+        islice(profile_items[0].get("latestPosts") or (), _MAX_POSTS)
     )
-    if not post_items:
-        raise RuntimeError(
+    if not posts:
+        raise ProfileUnavailableError(
             f"No posts returned for '{username}'. "
             "The account may be private or has no posts."
         )
-    posts = [_parse_post(item) for item in post_items]
 
-    return ScrapeResult(profile=profile, posts=posts)
+    result = ScrapeResult(profile=profile, posts=posts)
+    _cache_set(username, result)
+    return result
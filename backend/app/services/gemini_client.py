@@ -1,67 +1,201 @@
-"""Shared Gemini client singleton and image download utilities."""
+"""Shared Gemini client singleton, pooled HTTP client, and image download/prep utilities."""
 
 from __future__ import annotations
 
 import asyncio
+import io
 import logging
 import os
+import weakref
+from collections import OrderedDict
 from functools import lru_cache
 
 import httpx
 from google import genai
+from google.genai import types
+from PIL import Image
 
 logger = logging.getLogger(__name__)
 
 FLASH_MODEL = "gemini-2.5-flash"
+FLASH_LITE_MODEL = "gemini-2.5-flash-lite"
 IMAGE_GEN_MODEL = "gemini-3-pro-image-preview"
 
+_IMAGE_FORMATS = ("JPEG", "WEBP", "PNG")  # what the Instagram CDN serves
+
+# Connection pool bounds for both the Gemini SDK client and the download client
+_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+
 
 @lru_cache(maxsize=1)
 def get_gemini_client() -> genai.Client:
-    """Return a singleton Gemini client."""
+    """Return a singleton Gemini client.
+
+    The SDK keeps one pooled httpx client per ``genai.Client``; HTTP/2 lets
+    concurrent Flash and image calls multiplex over the same connection.
+    """
     api_key = os.environ.get("GOOGLE_API_KEY")
     if not api_key:
         raise RuntimeError("GOOGLE_API_KEY environment variable is not set")
-    return genai.Client(api_key=api_key)
+    return genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(
+            async_client_args={
+                "http2": True,
+                "limits": _HTTP_LIMITS,
+            },
+        ),
+    )
+
+
+# url → (etag, last_modified, content) for conditional re-downloads
+_IMAGE_CACHE_MAX_ENTRIES = 64
+_image_cache: OrderedDict[str, tuple[str | None, str | None, bytes]] = OrderedDict()
+
+# One pooled client per event loop — httpx connections are bound to the loop
+# that opened them, and tests / scripts may run several loops in one process.
+_http_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, httpx.AsyncClient
+] = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared pooled httpx client for the running event loop.
+
+    Reusing one HTTP/2 client keeps TCP/TLS connections alive across requests
+    and multiplexes concurrent downloads from the same CDN host over them.
+    The transport retries failed connection attempts twice.
+    """
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=30.0,
+            follow_redirects=True,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=_HTTP_LIMITS,
+                retries=2,
+            ),
+        )
+        _http_clients[loop] = client
+    return client
+
+
+_FLASH_CONCURRENCY = int(os.environ.get("GEMINI_FLASH_CONCURRENCY", "16"))
+_flash_semaphores: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, asyncio.Semaphore
+] = weakref.WeakKeyDictionary()
+
+
+def flash_slot() -> asyncio.Semaphore:
+    """Return the running loop's semaphore bounding concurrent Gemini Flash calls.
+
+    Use as ``async with flash_slot():`` around ``generate_content`` so bursts
+    from concurrent jobs queue locally instead of tripping per-minute rate
+    limits (``GEMINI_FLASH_CONCURRENCY``, default 16).
+    """
+    loop = asyncio.get_running_loop()
+    sem = _flash_semaphores.get(loop)
+    if sem is None:
+        sem = asyncio.Semaphore(_FLASH_CONCURRENCY)
+        _flash_semaphores[loop] = sem
+    return sem
+
+
+async def close_http_client() -> None:
+    """Close the shared httpx client for the running event loop, if any."""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
 
 
 async def download_image(
     url: str,
     client: httpx.AsyncClient | None = None,
 ) -> bytes | None:
-    """Download a single image, returning bytes or None on failure."""
-    own_client = client is None
-    if own_client:
-        client = httpx.AsyncClient(timeout=30.0)
+    """Download a single image, returning bytes or None on failure.
+
+    Responses carrying an ETag or Last-Modified header are kept in a small
+    in-process LRU cache and revalidated with a conditional GET, so a
+    repeat download of the same URL costs a 304 with no body.
+    """
+    if client is None:
+        client = get_http_client()
+
+    cached = _image_cache.get(url)
+    headers: dict[str, str] = {}
+    if cached is not None:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
     try:
-        resp = await client.get(url, follow_redirects=True)
+        resp = await client.get(url, headers=headers, follow_redirects=True)
+        if resp.status_code == 304 and cached is not None:
+            _image_cache.move_to_end(url)
+            return cached[2]
         resp.raise_for_status()
-        return resp.content
     except Exception:
         logger.warning("Failed to download image: %s", url, exc_info=True)
         return None
-    finally:
-        if own_client:
-            await client.aclose()
+
+    etag = resp.headers.get("etag")
+    last_modified = resp.headers.get("last-modified")
+    if etag or last_modified:
+        _image_cache[url] = (etag, last_modified, resp.content)
+        _image_cache.move_to_end(url)
+        while len(_image_cache) > _IMAGE_CACHE_MAX_ENTRIES:
+            _image_cache.popitem(last=False)
+    return resp.content
 
 
 async def download_images(
     urls: list[str],
     client: httpx.AsyncClient | None = None,
-    max_concurrent: int = 10,
+    max_concurrent: int = 32,
 ) -> list[bytes | None]:
-    """Download multiple images concurrently with a semaphore."""
+    """Download multiple images concurrently with a semaphore.
+
+    Duplicate URLs within the batch are fetched once.
+    """
     sem = asyncio.Semaphore(max_concurrent)
-    own_client = client is None
-    if own_client:
-        client = httpx.AsyncClient(timeout=30.0)
+    if client is None:
+        client = get_http_client()
 
     async def _dl(url: str) -> bytes | None:
         async with sem:
             return await download_image(url, client)
 
+    unique_urls = list(dict.fromkeys(urls))
+    results = await asyncio.gather(*[_dl(u) for u in unique_urls])
+    by_url = dict(zip(unique_urls, results))
+    return [by_url[u] for u in urls]
+
+
+def prepare_image_part(
+    raw: bytes,
+    max_size: tuple[int, int],
+    quality: int = 90,
+) -> types.Part | None:
+    """Decode, downscale to fit ``max_size``, and JPEG-encode an image as a Part.
+
+    CPU-bound — run via ``asyncio.to_thread``. Returns None if the image
+    can't be decoded. A ready-made JPEG Part is smaller to upload than the
+    original and avoids the SDK re-encoding a PIL image to PNG.
+    """
     try:
-        return await asyncio.gather(*[_dl(u) for u in urls])
-    finally:
-        if own_client:
-            await client.aclose()
+        img = Image.open(io.BytesIO(raw), formats=_IMAGE_FORMATS)
+        # JPEG only: let libjpeg decode at a reduced DCT scale (still >= target)
+        img.draft("RGB", max_size)
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=quality)
+    except Exception:
+        logger.warning("Failed to decode image for upload", exc_info=True)
+        return None
+    return types.Part.from_bytes(data=buf.getvalue(), mime_type="image/jpeg")
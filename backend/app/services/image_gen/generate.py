@@ -3,6 +3,8 @@
 Uses a SINGLE multi-turn chat session to generate both forward and backward
 room images sequentially. This ensures geometric consistency — the model
 remembers the room it created for the forward view when generating the backward view.
+The opt-in "parallel_prompted" mode trades that for wall time: one session per
+view, run concurrently, with the room envelope restated in the backward prompt.
 
 Max 2 attempts per viewpoint (1 round of critique each).
 """
@@ -10,18 +12,21 @@ Max 2 attempts per viewpoint (1 round of critique each).
 from __future__ import annotations
 
 import asyncio
-import base64
-import io
 import logging
+import os
+from functools import lru_cache
+from typing import Literal
 
+from google import genai
 from google.genai import types
-from PIL import Image
 
 from app.services.gemini_client import (
     FLASH_MODEL,
     IMAGE_GEN_MODEL,
     download_images,
+    flash_slot,
     get_gemini_client,
+    prepare_image_part,
 )
 from app.services.models import (
     AggregatedProfile,
@@ -35,7 +40,11 @@ from app.services.models import (
 logger = logging.getLogger(__name__)
 
 _CRITIQUE_THRESHOLD = 3.5
+# With the final critique skipped, an earlier attempt scoring within this of
+# the threshold is kept over the unscored refinement.
+_NEAR_PASS_MARGIN = 0.25
 _MAX_ATTEMPTS = 2
+_REFERENCE_MAX_SIZE = (1024, 1024)  # the generator doesn't need full-res originals
 
 _BACKWARD_TRANSITION = (
     "Now turn the camera 180° to face the opposite direction. "
@@ -44,6 +53,23 @@ _BACKWARD_TRANSITION = (
     "Generate this backward view:\n\n"
 )
 
+_PARALLEL_BACKWARD_TRANSITION = (
+    "This is the backward view of a room, taken from the same camera position "
+    "as a forward view that looks at: {forward_direction}. Both views must show "
+    "the SAME room — a {room_shape} room in {style} style with the window "
+    "{window_placement}, the same wall treatment and floor, a color palette of "
+    "{colors}, and {lighting} lighting at {time_of_day}. "
+    "Generate this backward view:\n\n"
+)
+
+# Refinement sent without critique feedback (critique failed, or speculative)
+_GENERIC_REFINEMENT_MESSAGE = (
+    "The previous image needs improvement. Please regenerate with "
+    "better overall quality, sharper objects, and more natural lighting."
+)
+
+ConsistencyMode = Literal["shared_chat", "parallel_prompted"]
+
 
 # ---------------------------------------------------------------------------
 # Public API
@@ -53,14 +79,28 @@ async def generate_dual_room_images(
     forward_prompt: ImageGenPrompt,
     backward_prompt: ImageGenPrompt | None,
     profile: AggregatedProfile,
+    *,
+    consistency_mode: ConsistencyMode = "shared_chat",
+    speculative_refinement: bool = False,
 ) -> DualImageGenResult:
     """Generate forward (and optionally backward) room images.
 
     When backward_prompt is None, only the forward view is generated and
     backward is returned as an empty ImageGenResult.
 
-    When backward_prompt is provided, both views are generated in a single
-    multi-turn chat session for geometric consistency.
+    When backward_prompt is provided, ``consistency_mode`` selects how the
+    two views are kept consistent:
+    - "shared_chat" (default): both views are generated sequentially in a
+      single multi-turn chat session for geometric consistency.
+    - "parallel_prompted": each view gets its own chat session and both run
+      concurrently; the backward prompt restates the shared room envelope
+      (style, palette, lighting, shape) instead of relying on chat memory.
+
+    ``speculative_refinement`` generates the generic second attempt while the
+    first is being critiqued, hiding one model round-trip when a retry is
+    needed at the cost of a wasted generation when it isn't. It is applied
+    only to chat sessions with no later turns (both views in
+    "parallel_prompted", the last view in "shared_chat").
     """
     # Download reference images (parallel if both views needed)
     if backward_prompt is not None:
@@ -73,18 +113,36 @@ async def generate_dual_room_images(
             forward_prompt.reference_image_urls,
         )
 
-    # Create a single multi-turn chat session
     client = get_gemini_client()
-    chat = client.aio.chats.create(
-        model=IMAGE_GEN_MODEL,
-        config=types.GenerateContentConfig(
-            response_modalities=["TEXT", "IMAGE"],
-            image_config=types.ImageConfig(
-                aspect_ratio="16:9",
-                image_size="4K",
+
+    if backward_prompt is not None and consistency_mode == "parallel_prompted":
+        logger.info("Generating forward and backward views in parallel chat sessions")
+        forward_result, backward_result = await asyncio.gather(
+            _generate_single_view(
+                chat=_create_chat(client),
+                prompt_data=forward_prompt,
+                profile=profile,
+                ref_images=fwd_ref_images,
+                view_label="forward",
+                transition_prefix=None,
+                speculate=speculative_refinement,
             ),
-        ),
-    )
+            _generate_single_view(
+                chat=_create_chat(client),
+                prompt_data=backward_prompt,
+                profile=profile,
+                ref_images=bwd_ref_images,
+                view_label="backward",
+                transition_prefix=_build_parallel_backward_prefix(
+                    forward_prompt, profile,
+                ),
+                speculate=speculative_refinement,
+            ),
+        )
+        return DualImageGenResult(forward=forward_result, backward=backward_result)
+
+    # Create a single multi-turn chat session
+    chat = _create_chat(client)
 
     # --- Forward view ---
     logger.info("Generating forward view")
@@ -95,6 +153,7 @@ async def generate_dual_room_images(
         ref_images=fwd_ref_images,
         view_label="forward",
         transition_prefix=None,
+        speculate=speculative_refinement and backward_prompt is None,
     )
 
     # --- Backward view ---
@@ -107,6 +166,7 @@ async def generate_dual_room_images(
             ref_images=bwd_ref_images,
             view_label="backward",
             transition_prefix=_BACKWARD_TRANSITION,
+            speculate=speculative_refinement,
         )
     else:
         logger.info("Backward view skipped (single-view mode)")
@@ -118,6 +178,37 @@ async def generate_dual_room_images(
     )
 
 
+def _create_chat(client: genai.Client) -> types.AsyncChat:
+    """Create a multi-turn image generation chat session."""
+    return client.aio.chats.create(
+        model=IMAGE_GEN_MODEL,
+        config=types.GenerateContentConfig(
+            response_modalities=["TEXT", "IMAGE"],
+            image_config=types.ImageConfig(
+                aspect_ratio="16:9",
+                image_size="4K",
+            ),
+        ),
+    )
+
+
+def _build_parallel_backward_prefix(
+    forward_prompt: ImageGenPrompt,
+    profile: AggregatedProfile,
+) -> str:
+    """Describe the shared room envelope for a backward view in its own session."""
+    layout = forward_prompt.layout
+    return _PARALLEL_BACKWARD_TRANSITION.format(
+        room_shape=layout.room_shape or "rectangular",
+        window_placement=layout.window_placement or "on the far wall",
+        style=profile.atmosphere.style,
+        colors=", ".join(profile.atmosphere.color_palette) or "(varied)",
+        lighting=profile.atmosphere.dominant_lighting,
+        time_of_day=profile.atmosphere.time_of_day,
+        forward_direction=layout.camera_direction or "the opposite side of the room",
+    )
+
+
 # ---------------------------------------------------------------------------
 # Single-view generation (used for both forward and backward)
 # ---------------------------------------------------------------------------
@@ -126,93 +217,141 @@ async def _generate_single_view(
     chat: types.AsyncChat,
     prompt_data: ImageGenPrompt,
     profile: AggregatedProfile,
-    ref_images: list[Image.Image],
+    ref_images: list[types.Part],
     view_label: str,
     transition_prefix: str | None,
+    speculate: bool = False,
 ) -> ImageGenResult:
     """Generate a single viewpoint with critique-driven refinement.
 
     Up to _MAX_ATTEMPTS turns in the chat for this viewpoint.
+
+    With ``speculate``, the next attempt is generated with the generic
+    refinement message while the current attempt is being critiqued, and
+    discarded if the critique passes. Only safe when no later turn reuses
+    ``chat`` — the speculative turn stays in its history.
     """
     attempts: list[GenerationAttempt] = []
     best_attempt: GenerationAttempt | None = None
+    speculative_task: asyncio.Task[bytes | None] | None = None
+    critique_prompt = _build_critique_prompt(prompt_data, profile)
+    # The last attempt's critique only scores it for best-attempt selection;
+    # RUN_FINAL_CRITIQUE=0 skips that call. The unscored refinement then wins
+    # unless an earlier attempt scored within _NEAR_PASS_MARGIN of passing.
+    run_final_critique = os.environ.get("RUN_FINAL_CRITIQUE", "1") != "0"
 
-    for attempt_num in range(1, _MAX_ATTEMPTS + 1):
-        if attempt_num == 1:
-            # First attempt: send reference images + prompt
-            prompt_text = prompt_data.final_prompt
-            if transition_prefix:
-                prompt_text = transition_prefix + prompt_text
-
-            message: list = []
-            for img in ref_images:
-                message.append(img)
-            message.append(prompt_text)
-        else:
-            # Refinement: send critique feedback
-            prompt_text = _build_refinement_message(
-                best_attempt.critique if best_attempt else None,
-            )
-            message = [prompt_text]
-
-        # Generate image via chat turn
-        image_b64 = await _chat_generate(chat, message)
-        if not image_b64:
-            logger.error(
-                "%s view: image generation failed on attempt %d",
-                view_label, attempt_num,
-            )
-            attempts.append(GenerationAttempt(
+    try:
+        for attempt_num in range(1, _MAX_ATTEMPTS + 1):
+            if attempt_num == 1:
+                # First attempt: send reference images + prompt
+                prompt_text = prompt_data.final_prompt
+                if transition_prefix:
+                    prompt_text = transition_prefix + prompt_text
+
+                message: list = [*ref_images, prompt_text]
+            elif speculative_task is not None:
+                # Refinement already generated speculatively during the critique
+                prompt_text = _GENERIC_REFINEMENT_MESSAGE
+            else:
+                # Refinement: send critique feedback
+                prompt_text = _build_refinement_message(
+                    best_attempt.critique if best_attempt else None,
+                )
+                message = [prompt_text]
+
+            # Generate image via chat turn
+            if speculative_task is not None:
+                image_bytes = await speculative_task
+                speculative_task = None
+            else:
+                image_bytes = await _chat_generate(chat, message)
+            if not image_bytes:
+                logger.error(
+                    "%s view: image generation failed on attempt %d",
+                    view_label, attempt_num,
+                )
+                attempts.append(GenerationAttempt(
+                    attempt_number=attempt_num,
+                    prompt_used=prompt_text if isinstance(prompt_text, str) else str(prompt_text),
+                ))
+                continue
+
+            if attempt_num == _MAX_ATTEMPTS and not run_final_critique:
+                # No further attempt to steer — keep the refined image unscored
+                attempt = GenerationAttempt(
+                    attempt_number=attempt_num,
+                    image_bytes=image_bytes,
+                    prompt_used=prompt_text if isinstance(prompt_text, str) else str(prompt_text),
+                )
+                attempts.append(attempt)
+                logger.info(
+                    "%s view attempt %d: final critique skipped (RUN_FINAL_CRITIQUE=0)",
+                    view_label, attempt_num,
+                )
+                if (
+                    best_attempt is None
+                    or best_attempt.critique is None
+                    or best_attempt.critique.avg_score
+                    < _CRITIQUE_THRESHOLD - _NEAR_PASS_MARGIN
+                ):
+                    best_attempt = attempt
+                break
+
+            if speculate and attempt_num < _MAX_ATTEMPTS:
+                speculative_task = asyncio.create_task(
+                    _chat_generate(chat, [_GENERIC_REFINEMENT_MESSAGE]),
+                )
+
+            # Critique — only against THIS view's objects
+            critique = await _critique_image(image_bytes, critique_prompt)
+
+            attempt = GenerationAttempt(
                 attempt_number=attempt_num,
+                image_bytes=image_bytes,
+                critique=critique,
                 prompt_used=prompt_text if isinstance(prompt_text, str) else str(prompt_text),
-            ))
-            continue
-
-        # Critique — only against THIS view's objects
-        critique = await _critique_image(image_b64, prompt_data, profile)
-
-        attempt = GenerationAttempt(
-            attempt_number=attempt_num,
-            image_base64=image_b64,
-            critique=critique,
-            prompt_used=prompt_text if isinstance(prompt_text, str) else str(prompt_text),
-        )
-        attempts.append(attempt)
-
-        if best_attempt is None or (
-            critique is not None and (
-                best_attempt.critique is None
-                or critique.avg_score > best_attempt.critique.avg_score
-            )
-        ):
-            best_attempt = attempt
-
-        if critique is None:
-            # Critique call failed (e.g. 503) — accept the image as-is
-            logger.warning(
-                "%s view attempt %d: critique failed, accepting image",
-                view_label, attempt_num,
-            )
-            break
-
-        if critique.avg_score >= _CRITIQUE_THRESHOLD:
-            logger.info(
-                "%s view attempt %d scored %.2f (>= %.1f), stopping",
-                view_label, attempt_num, critique.avg_score, _CRITIQUE_THRESHOLD,
-            )
-            break
-
-        if attempt_num < _MAX_ATTEMPTS:
-            logger.info(
-                "%s view attempt %d scored %.2f (< %.1f), will retry",
-                view_label, attempt_num, critique.avg_score, _CRITIQUE_THRESHOLD,
             )
+            attempts.append(attempt)
+
+            if best_attempt is None or (
+                critique is not None and (
+                    best_attempt.critique is None
+                    or critique.avg_score > best_attempt.critique.avg_score
+                )
+            ):
+                best_attempt = attempt
+
+            if critique is None:
+                # Critique call failed (e.g. 503) — accept the image as-is
+                logger.warning(
+                    "%s view attempt %d: critique failed, accepting image",
+                    view_label, attempt_num,
+                )
+                break
+
+            if critique.avg_score >= _CRITIQUE_THRESHOLD:
+                logger.info(
+                    "%s view attempt %d scored %.2f (>= %.1f), stopping",
+                    view_label, attempt_num, critique.avg_score, _CRITIQUE_THRESHOLD,
+                )
+                break
+
+            if attempt_num < _MAX_ATTEMPTS:
+                logger.info(
+                    "%s view attempt %d scored %.2f (< %.1f), will retry",
+                    view_label, attempt_num, critique.avg_score, _CRITIQUE_THRESHOLD,
+                )
+
+    finally:
+        if speculative_task is not None:
+            # Critique passed (or failed) — the speculative refinement is unused
+            speculative_task.cancel()
 
     if best_attempt is None:
         best_attempt = attempts[-1] if attempts else GenerationAttempt(attempt_number=0)
 
     return ImageGenResult(
-        final_image_base64=best_attempt.image_base64,
+        final_image_bytes=best_attempt.image_bytes,
         final_critique=best_attempt.critique,
         attempts=attempts,
         total_attempts=len(attempts),
@@ -223,20 +362,17 @@ async def _generate_single_view(
 # Reference image download
 # ---------------------------------------------------------------------------
 
-async def _download_reference_images(urls: list[str]) -> list[Image.Image]:
-    """Download and convert reference images to PIL Image objects."""
+async def _download_reference_images(urls: list[str]) -> list[types.Part]:
+    """Download reference images and prepare them as Parts off the event loop."""
     if not urls:
         return []
 
     raw_images = await download_images(urls)
-    pil_images: list[Image.Image] = []
-    for raw in raw_images:
-        if raw is not None:
-            try:
-                pil_images.append(Image.open(io.BytesIO(raw)))
-            except Exception:
-                logger.warning("Failed to open reference image as PIL", exc_info=True)
-    return pil_images
+    prepared = await asyncio.gather(*[
+        asyncio.to_thread(prepare_image_part, raw, _REFERENCE_MAX_SIZE)
+        for raw in raw_images if raw is not None
+    ])
+    return [part for part in prepared if part is not None]
 
 
 # ---------------------------------------------------------------------------
@@ -246,8 +382,8 @@ async def _download_reference_images(urls: list[str]) -> list[Image.Image]:
 async def _chat_generate(
     chat: types.AsyncChat,
     message: list,
-) -> str | None:
-    """Send a message in the chat and extract the generated image."""
+) -> bytes | None:
+    """Send a message in the chat and extract the generated image bytes."""
     try:
         response = await chat.send_message(message)
     except Exception:
@@ -261,7 +397,7 @@ async def _chat_generate(
 
     for part in response.candidates[0].content.parts:
         if part.inline_data and part.inline_data.data:
-            return base64.b64encode(part.inline_data.data).decode("utf-8")
+            return part.inline_data.data
 
     logger.warning("No image data in generation response")
     return None
@@ -290,22 +426,18 @@ For each dimension, provide a score (1-4) and brief feedback explaining why.
 """
 
 
-async def _critique_image(
-    image_b64: str,
+def _build_critique_prompt(
     prompt_data: ImageGenPrompt,
     profile: AggregatedProfile,
-) -> CritiqueScores | None:
-    """Critique a generated image with Gemini Flash.
+) -> str:
+    """Format the critique prompt for one view (constant across its attempts).
 
     Uses the per-view object list (prompt_data.object_details) so each view
     is only judged on its own objects, not the full profile.
     """
-    image_bytes = base64.b64decode(image_b64)
-
-    # Per-view critique: use this view's object details, not the full profile
-    objects_list = ", ".join(od.name for od in prompt_data.object_details)
+    objects_list = ", ".join([od.name for od in prompt_data.object_details])
 
-    prompt = _CRITIQUE_PROMPT.format(
+    return _CRITIQUE_PROMPT.format(
         persona=profile.persona_summary,
         mood=profile.atmosphere.dominant_mood,
         lighting=profile.atmosphere.dominant_lighting,
@@ -313,6 +445,12 @@ async def _critique_image(
         objects=objects_list or "(none specified)",
     )
 
+
+async def _critique_image(
+    image_bytes: bytes,
+    prompt: str,
+) -> CritiqueScores | None:
+    """Critique a generated image with Gemini Flash against a prebuilt prompt."""
     parts: list[types.Part] = [
         types.Part.from_bytes(data=image_bytes, mime_type="image/png"),
         types.Part.from_text(text=prompt),
@@ -320,15 +458,16 @@ async def _critique_image(
 
     client = get_gemini_client()
     try:
-        response = await client.aio.models.generate_content(
-            model=FLASH_MODEL,
-            contents=parts,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=CritiqueScores,
-                temperature=0.2,
-            ),
-        )
+        async with flash_slot():
+            response = await client.aio.models.generate_content(
+                model=FLASH_MODEL,
+                contents=parts,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                    response_schema=CritiqueScores,
+                    temperature=0.2,
+                ),
+            )
     except Exception:
         logger.error("Critique API call failed", exc_info=True)
         return None
@@ -348,29 +487,37 @@ async def _critique_image(
 def _build_refinement_message(critique: CritiqueScores | None) -> str:
     """Build a refinement message from critique feedback for the next chat turn."""
     if not critique:
-        return (
-            "The previous image needs improvement. Please regenerate with "
-            "better overall quality, sharper objects, and more natural lighting."
-        )
+        return _GENERIC_REFINEMENT_MESSAGE
+
+    # No dimension below 3 → only the generic quality nudge applies, whatever
+    # the feedback text; the empty key shares one cache entry.
+    if min(getattr(critique, dimension) for dimension, _ in _REFINEMENT_ISSUES) >= 3:
+        return _refinement_message_cached(())
+
+    # Memoized on scalar fields, not the CritiqueScores instance
+    return _refinement_message_cached(tuple(
+        (getattr(critique, dimension), getattr(critique, f"{dimension}_feedback"))
+        for dimension, _ in _REFINEMENT_ISSUES
+    ))
+
+
+# (critique dimension, issue label) — a dimension scoring < 3 becomes an issue
+_REFINEMENT_ISSUES = (
+    ("object_presence", "Objects are not visible enough"),
+    ("atmosphere_match", "Atmosphere doesn't match"),
+    ("spatial_coherence", "Spatial layout issues"),
+    ("overall_quality", "Quality issues"),
+)
 
-    issues: list[str] = []
 
-    if critique.object_presence < 3:
-        issues.append(
-            f"Objects are not visible enough: {critique.object_presence_feedback}"
-        )
-    if critique.atmosphere_match < 3:
-        issues.append(
-            f"Atmosphere doesn't match: {critique.atmosphere_match_feedback}"
-        )
-    if critique.spatial_coherence < 3:
-        issues.append(
-            f"Spatial layout issues: {critique.spatial_coherence_feedback}"
-        )
-    if critique.overall_quality < 3:
-        issues.append(
-            f"Quality issues: {critique.overall_quality_feedback}"
-        )
+@lru_cache(maxsize=256)
+def _refinement_message_cached(scores: tuple[tuple[int, str], ...]) -> str:
+    """Format the refinement message for (score, feedback) pairs in _REFINEMENT_ISSUES order."""
+    issues = [
+        f"{label}: {feedback}"
+        for (_, label), (score, feedback) in zip(_REFINEMENT_ISSUES, scores)
+        if score < 3
+    ]
 
     if not issues:
         issues.append(
@@ -378,7 +525,7 @@ def _build_refinement_message(critique: CritiqueScores | None) -> str:
             "lighting more natural, and composition more compelling."
         )
 
-    feedback = "\n".join(f"- {issue}" for issue in issues)
+    feedback = "\n".join([f"- {issue}" for issue in issues])
     return (
         f"Please refine the previous image. Keep what works well but fix these issues:\n"
         f"{feedback}\n\n"
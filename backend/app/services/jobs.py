@@ -0,0 +1,155 @@
+"""In-process background job registry for pipeline runs.
+
+HTTP handlers enqueue a job and return its ``job_id`` immediately; the
+scrape + pipeline work runs as an asyncio task on the server's event loop
+and records its progress on the ``Job`` for ``GET /api/jobs/{job_id}``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from enum import StrEnum
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.services.crawler.scraper import ScrapeResult, ScraperRunError, scrape_profile
+from app.services.pipeline import run_pipeline
+
+logger = logging.getLogger(__name__)
+
+_SCRAPE_MAX_RETRIES = 3
+_SCRAPE_RETRY_BACKOFF_SECONDS = 2.0
+
+
+class JobStatus(StrEnum):
+    CRAWLING = "crawling"
+    ANALYZING = "analyzing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class Job(BaseModel):
+    """Job state as returned by the job status endpoint."""
+
+    job_id: str
+    username: str | None = None
+    status: JobStatus = JobStatus.CRAWLING
+    stage: int | None = 0
+    progress: str | None = None
+    result: dict[str, Any] | None = None
+    error: dict[str, Any] | None = None
+
+
+_jobs: dict[str, Job] = {}
+# Normalized username → job_id, for in-flight and successfully completed jobs
+_active_by_username: dict[str, str] = {}
+_completed_by_username: dict[str, str] = {}
+# Strong references so running tasks are not garbage-collected mid-flight
+_tasks: set[asyncio.Task] = set()
+
+
+def get_job(job_id: str) -> Job | None:
+    """Return the job with this ID, or None if unknown."""
+    return _jobs.get(job_id)
+
+
+def _username_key(username: str) -> str:
+    return username.lstrip("@").lower()
+
+
+def find_username_job(username: str) -> Job | None:
+    """Return the in-progress or completed job for ``username``, if any.
+
+    An in-progress job takes precedence over an older completed one.
+    """
+    key = _username_key(username)
+    job_id = _active_by_username.get(key) or _completed_by_username.get(key)
+    return _jobs.get(job_id) if job_id else None
+
+
+def get_completed_username_job(username: str) -> Job | None:
+    """Return the most recent completed job for ``username``, if any."""
+    job_id = _completed_by_username.get(_username_key(username))
+    return _jobs.get(job_id) if job_id else None
+
+
+def start_username_job(username: str) -> Job:
+    """Register a new job for ``username`` and start it in the background.
+
+    Callers should check ``find_username_job`` first so concurrent requests
+    for the same username share one job instead of scraping twice.
+    """
+    job = Job(job_id=str(uuid.uuid4()), username=username)
+    _jobs[job.job_id] = job
+    _active_by_username[_username_key(username)] = job.job_id
+
+    task = asyncio.create_task(_run_username_job(job))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+async def _scrape_with_retry(username: str) -> ScrapeResult:
+    """Scrape a profile, retrying transient Apify failures with backoff.
+
+    Permanent failures — a private or empty profile, or a non-retryable HTTP
+    error — raise immediately instead of paying for more Apify runs.
+    """
+    for attempt in range(_SCRAPE_MAX_RETRIES + 1):
+        try:
+            return await scrape_profile(username)
+        except ScraperRunError as exc:
+            if not exc.transient or attempt == _SCRAPE_MAX_RETRIES:
+                raise
+            delay = _SCRAPE_RETRY_BACKOFF_SECONDS * 2**attempt
+            logger.warning(
+                "Scrape for @%s failed (attempt %d), retrying in %.0fs",
+                username,
+                attempt + 1,
+                delay,
+                exc_info=True,
+            )
+            await asyncio.sleep(delay)
+
+
+async def _run_username_job(job: Job) -> None:
+    """Scrape the profile and run the full pipeline, updating ``job`` as it goes."""
+    try:
+        job.progress = f"Fetching @{job.username} from Instagram"
+        crawl_result = await _scrape_with_retry(job.username)
+
+        job.status = JobStatus.ANALYZING
+        job.stage = 1
+        job.progress = f"Analyzing {len(crawl_result.posts)} posts"
+        _, profile, scene_result = await run_pipeline(
+            crawl_result,
+            run_3d_conversion=True,
+        )
+        # run_pipeline logs and swallows Stage 5 failures. Without a scene there
+        # is no room, so fail the job rather than pin a room-less completion
+        # that would block every retry for this username.
+        if scene_result is None:
+            job.stage = 5
+            raise RuntimeError("3D scene conversion failed")
+
+        # Only CDN URLs go into the job result — the generated image bytes
+        # stay in the pipeline (and its output dir), never in polled state.
+        job.result = {
+            "room_id": scene_result.world_id,
+            "screenshot_url": scene_result.thumbnail_url,
+            "persona_summary": profile.persona_summary,
+            "viewer_data": scene_result.viewer_data.model_dump(),
+        }
+        job.status = JobStatus.COMPLETED
+        job.stage = None
+        job.progress = None
+        _completed_by_username[_username_key(job.username)] = job.job_id
+    except Exception as exc:
+        logger.exception("Job %s failed", job.job_id)
+        job.error = {"message": str(exc), "stage": job.stage}
+        job.status = JobStatus.FAILED
+    finally:
+        _active_by_username.pop(_username_key(job.username), None)
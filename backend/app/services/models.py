@@ -6,9 +6,10 @@ app.services.crawler.scraper and re-exported here for convenience.
 
 from __future__ import annotations
 
+import base64
 import enum
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 
 # Re-export Stage 0 models so consumers can import from one place
 from app.services.crawler.scraper import Post, Profile, ScrapeResult
@@ -16,6 +17,12 @@ from app.services.crawler.scraper import Post, Profile, ScrapeResult
 # Re-export Stage 5 output models
 from app.services.worldslabs.models import ConvertToSceneResult, ViewerData
 
+try:  # SIMD base64 codec when installed (pip install .[speedups])
+    from pybase64 import b64encode_as_string as _b64encode
+except ImportError:
+    def _b64encode(data: bytes) -> str:
+        return base64.b64encode(data).decode("ascii")
+
 __all__ = [
     # Stage 0 (re-exports)
     "Post", "Profile", "ScrapeResult",
@@ -44,12 +51,16 @@ class Prominence(str, enum.Enum):
 
 
 class DetectedObject(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str
     prominence: Prominence
     description: str = ""
 
 
 class SceneInfo(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     location_type: str = ""
     mood: list[str] = Field(default_factory=list)
     lighting: str = ""
@@ -57,6 +68,8 @@ class SceneInfo(BaseModel):
 
 
 class PeopleInfo(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     count: int = 0
     is_selfie: bool = False
     activity: str | None = None
@@ -89,6 +102,8 @@ class PostAnalysisWithMeta(BaseModel):
 # ---------------------------------------------------------------------------
 
 class ScoredObject(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str
     importance: float = 0.0
     description: str = ""
@@ -130,6 +145,8 @@ class LayoutPlan(BaseModel):
 
 
 class ObjectDetail(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str
     placement: str = ""
     detailed_description: str = ""
@@ -147,7 +164,13 @@ class ImageGenPrompt(BaseModel):
 # Stage 4 — Image generation + critique
 # ---------------------------------------------------------------------------
 
+def _b64(data: bytes) -> str:
+    return _b64encode(data) if data else ""
+
+
 class CritiqueScores(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     object_presence: int = Field(default=3, ge=1, le=4)
     object_presence_feedback: str = ""
     atmosphere_match: int = Field(default=3, ge=1, le=4)
@@ -169,17 +192,29 @@ class CritiqueScores(BaseModel):
 
 class GenerationAttempt(BaseModel):
     attempt_number: int
-    image_base64: str = ""
+    image_bytes: bytes = Field(default=b"", exclude=True)
     critique: CritiqueScores | None = None
     prompt_used: str = ""
 
+    @computed_field
+    @property
+    def image_base64(self) -> str:
+        """Base64 of ``image_bytes`` — encoded only when serialized or read."""
+        return _b64(self.image_bytes)
+
 
 class ImageGenResult(BaseModel):
-    final_image_base64: str = ""
+    final_image_bytes: bytes = Field(default=b"", exclude=True)
     final_critique: CritiqueScores | None = None
     attempts: list[GenerationAttempt] = Field(default_factory=list)
     total_attempts: int = 0
 
+    @computed_field
+    @property
+    def final_image_base64(self) -> str:
+        """Base64 of ``final_image_bytes`` — encoded only when serialized or read."""
+        return _b64(self.final_image_bytes)
+
 
 class DualImageGenResult(BaseModel):
     forward: ImageGenResult = Field(default_factory=ImageGenResult)
@@ -1,14 +1,15 @@
-"""Pipeline orchestrator: runs Stages 1-5 sequentially and saves debug output."""
+"""Pipeline orchestrator: runs Stages 1-5 in order and saves debug output."""
 
 from __future__ import annotations
 
-import base64
-import json
+import asyncio
 import logging
 import os
 from datetime import datetime, timezone
 
-from app.services.image_gen.generate import generate_dual_room_images
+import pydantic_core
+
+from app.services.image_gen.generate import ConsistencyMode, generate_dual_room_images
 from app.services.models import (
     AggregatedProfile,
     ConvertToSceneResult,
@@ -31,18 +32,23 @@ from app.services.worldslabs.config import MarbleModel, get_api_key as _get_worl
 
 logger = logging.getLogger(__name__)
 
-
 async def run_pipeline(
     crawl_result: ScrapeResult,
     output_dir: str = "output",
     run_3d_conversion: bool = False,
     dual_view: bool = True,
+    consistency_mode: ConsistencyMode = "shared_chat",
 ) -> tuple[DualImageGenResult, AggregatedProfile, ConvertToSceneResult | None]:
     """Run the full VLM pipeline: Stage 1 → 2 → 3 → 4 → 5.
 
     Returns the dual image generation result, the aggregated profile,
     and the 3D scene conversion result (None if skipped or failed).
     All intermediate results are saved to a debug JSON file.
+
+    ``consistency_mode="parallel_prompted"`` generates the forward and
+    backward views concurrently in separate chat sessions, so Stage 4 takes
+    roughly as long as one view instead of both (see
+    ``generate_dual_room_images``).
     """
     username = crawl_result.profile.username
 
@@ -56,29 +62,24 @@ async def run_pipeline(
         )
     logger.info("Stage 1 complete: %d/%d posts analyzed", len(analyses), len(crawl_result.posts))
 
-    # Stage 2: Aggregation
-    logger.info("Stage 2: Aggregating analyses into persona profile")
-    profile = await aggregate_analyses(analyses, crawl_result.profile)
-    logger.info("Stage 2 complete: %d key objects, style=%s", len(profile.key_objects), profile.atmosphere.style)
+    profile, forward_prompt, backward_prompt = await _aggregate_and_design(
+        analyses, crawl_result, dual_view,
+    )
 
-    # Stage 3: Prompt design (returns forward + optional backward prompts)
-    logger.info("Stage 3: Designing %s image generation prompts", "dual" if dual_view else "single")
-    forward_prompt, backward_prompt = await design_prompt(profile, dual_view=dual_view)
-    if backward_prompt is not None:
-        logger.info(
-            "Stage 3 complete: forward prompt=%d chars (%d refs), backward prompt=%d chars (%d refs)",
-            len(forward_prompt.final_prompt), len(forward_prompt.reference_image_urls),
-            len(backward_prompt.final_prompt), len(backward_prompt.reference_image_urls),
-        )
-    else:
-        logger.info(
-            "Stage 3 complete: single-view prompt=%d chars (%d refs)",
-            len(forward_prompt.final_prompt), len(forward_prompt.reference_image_urls),
-        )
+    # The 3D spatial prompt only depends on Stages 2-3 — generate it while
+    # Stage 4 runs instead of after it. Never raises (falls back to a default).
+    prompt_3d_task = asyncio.create_task(generate_3d_prompt(profile, forward_prompt))
 
     # Stage 4: Image generation + critique
     logger.info("Stage 4: Generating %s room images", "dual (forward + backward)" if backward_prompt else "single")
-    result = await generate_dual_room_images(forward_prompt, backward_prompt, profile)
+    try:
+        result = await generate_dual_room_images(
+            forward_prompt, backward_prompt, profile,
+            consistency_mode=consistency_mode,
+        )
+    except BaseException:
+        prompt_3d_task.cancel()
+        raise
     logger.info(
         "Stage 4 complete: forward=%d attempts (score=%.2f), backward=%d attempts (score=%.2f)",
         result.forward.total_attempts,
@@ -89,14 +90,16 @@ async def run_pipeline(
 
     # Generate 3D spatial prompt (always, for debug output)
     text_prompt_3d: str | None = None
-    has_any_image = result.forward.final_image_base64 or result.backward.final_image_base64
+    has_any_image = result.forward.final_image_bytes or result.backward.final_image_bytes
     if has_any_image:
-        text_prompt_3d = await generate_3d_prompt(profile, forward_prompt)
+        text_prompt_3d = await prompt_3d_task
         logger.info("3D spatial prompt generated (%d chars)", len(text_prompt_3d))
+    else:
+        prompt_3d_task.cancel()
 
     # Stage 5: 3D conversion via World Labs Marble
     scene_result: ConvertToSceneResult | None = None
-    has_both_images = result.forward.final_image_base64 and result.backward.final_image_base64
+    has_both_images = result.forward.final_image_bytes and result.backward.final_image_bytes
 
     if run_3d_conversion and has_any_image:
         try:
@@ -106,11 +109,11 @@ async def run_pipeline(
 
             if has_both_images:
                 # Multi-image mode: send both forward and backward views
-                fwd_bytes = base64.b64decode(result.forward.final_image_base64)
-                bwd_bytes = base64.b64decode(result.backward.final_image_base64)
-
                 request = ConvertToSceneRequest(
-                    image_bytes_list=[fwd_bytes, bwd_bytes],
+                    image_bytes_list=[
+                        result.forward.final_image_bytes,
+                        result.backward.final_image_bytes,
+                    ],
                     text_prompt=text_prompt_3d,
                     model=MarbleModel.PLUS,
                     display_name=f"Instaroom — @{username}",
@@ -118,8 +121,7 @@ async def run_pipeline(
                 )
             else:
                 # Fallback: single image (whichever succeeded)
-                image_b64 = result.forward.final_image_base64 or result.backward.final_image_base64
-                image_bytes = base64.b64decode(image_b64)
+                image_bytes = result.forward.final_image_bytes or result.backward.final_image_bytes
 
                 request = ConvertToSceneRequest(
                     image_bytes=image_bytes,
@@ -141,8 +143,9 @@ async def run_pipeline(
     else:
         logger.warning("Stage 5: Skipped (no images from Stage 4)")
 
-    # Save debug output
-    _save_debug_output(
+    # Save debug output — file writes run in a worker thread, off the event loop
+    await asyncio.to_thread(
+        _save_debug_output,
         output_dir, crawl_result, analyses, profile,
         forward_prompt, backward_prompt, result, scene_result,
         text_prompt_3d,
@@ -151,6 +154,35 @@ async def run_pipeline(
     return result, profile, scene_result
 
 
+async def _aggregate_and_design(
+    analyses: list[PostAnalysisWithMeta],
+    crawl_result: ScrapeResult,
+    dual_view: bool,
+) -> tuple[AggregatedProfile, ImageGenPrompt, ImageGenPrompt | None]:
+    """Run Stage 2 (aggregation) and Stage 3 (prompt design)."""
+    # Stage 2: Aggregation
+    logger.info("Stage 2: Aggregating analyses into persona profile")
+    profile = await aggregate_analyses(analyses, crawl_result.profile)
+    logger.info("Stage 2 complete: %d key objects, style=%s", len(profile.key_objects), profile.atmosphere.style)
+
+    # Stage 3: Prompt design (returns forward + optional backward prompts)
+    logger.info("Stage 3: Designing %s image generation prompts", "dual" if dual_view else "single")
+    forward_prompt, backward_prompt = await design_prompt(profile, dual_view=dual_view)
+    if backward_prompt is not None:
+        logger.info(
+            "Stage 3 complete: forward prompt=%d chars (%d refs), backward prompt=%d chars (%d refs)",
+            len(forward_prompt.final_prompt), len(forward_prompt.reference_image_urls),
+            len(backward_prompt.final_prompt), len(backward_prompt.reference_image_urls),
+        )
+    else:
+        logger.info(
+            "Stage 3 complete: single-view prompt=%d chars (%d refs)",
+            len(forward_prompt.final_prompt), len(forward_prompt.reference_image_urls),
+        )
+
+    return profile, forward_prompt, backward_prompt
+
+
 def _save_debug_output(
     output_dir: str,
     crawl_result: ScrapeResult,
@@ -165,6 +197,7 @@ def _save_debug_output(
     """Save all intermediate results to a debug JSON file + image files."""
     username = crawl_result.profile.username
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    file_prefix = f"{username}_{timestamp}"
 
     os.makedirs(output_dir, exist_ok=True)
 
@@ -172,32 +205,33 @@ def _save_debug_output(
         view_result: ImageGenResult,
         view_label: str,
     ) -> list[dict]:
-        """Save attempt images for a single viewpoint and return JSON-safe data."""
+        """Save attempt images for a single viewpoint and return debug JSON data."""
         attempts_json = []
+        saved_count = 0
+        filename_prefix = f"{file_prefix}_{view_label}_attempt_"
         for attempt in view_result.attempts:
             image_filename = ""
-            if attempt.image_base64:
-                image_filename = (
-                    f"{username}_{timestamp}_{view_label}_attempt_{attempt.attempt_number}.png"
-                )
+            if attempt.image_bytes:
+                image_filename = f"{filename_prefix}{attempt.attempt_number}.png"
                 image_path = os.path.join(output_dir, image_filename)
                 try:
-                    image_bytes = base64.b64decode(attempt.image_base64)
                     with open(image_path, "wb") as f:
-                        f.write(image_bytes)
-                    logger.info(
-                        "Saved %s attempt %d image to %s",
-                        view_label, attempt.attempt_number, image_path,
-                    )
+                        f.write(attempt.image_bytes)
+                    saved_count += 1
+                    logger.debug("Saved %s attempt image to %s", view_label, image_path)
                 except Exception:
                     logger.error("Failed to save attempt image", exc_info=True)
 
             attempts_json.append({
                 "attempt_number": attempt.attempt_number,
                 "image_file": image_filename,
-                "critique": attempt.critique.model_dump() if attempt.critique else None,
+                "critique": attempt.critique,
                 "prompt_used": attempt.prompt_used,
             })
+        if saved_count:
+            logger.info(
+                "Saved %d %s attempt image(s) to %s", saved_count, view_label, output_dir,
+            )
         return attempts_json
 
     fwd_attempts_json = _save_view_attempts(result.forward, "forward")
@@ -205,15 +239,15 @@ def _save_debug_output(
 
     def _prompt_to_dict(prompt_data: ImageGenPrompt) -> dict:
         return {
-            "layout": prompt_data.layout.model_dump(),
-            "object_details": [od.model_dump() for od in prompt_data.object_details],
+            "layout": prompt_data.layout,
+            "object_details": prompt_data.object_details,
             "final_prompt": prompt_data.final_prompt,
             "reference_image_urls": prompt_data.reference_image_urls,
-            "reference_image_mapping": {
-                str(k): v for k, v in prompt_data.reference_image_mapping.items()
-            },
+            "reference_image_mapping": prompt_data.reference_image_mapping,
         }
 
+    # Models are left as-is: pydantic-core serializes them straight to JSON
+    # in one pass, with no intermediate model_dump() dicts.
     debug_data = {
         "metadata": {
             "username": username,
@@ -221,8 +255,8 @@ def _save_debug_output(
             "post_count": len(crawl_result.posts),
             "analyzed_count": len(analyses),
         },
-        "stage_1_analyses": [a.model_dump() for a in analyses],
-        "stage_2_profile": profile.model_dump(),
+        "stage_1_analyses": analyses,
+        "stage_2_profile": profile,
         "stage_3_prompt": {
             "forward": _prompt_to_dict(forward_prompt),
             "backward": _prompt_to_dict(backward_prompt) if backward_prompt else None,
@@ -230,18 +264,12 @@ def _save_debug_output(
         "stage_4_result": {
             "forward": {
                 "attempts": fwd_attempts_json,
-                "final_critique": (
-                    result.forward.final_critique.model_dump()
-                    if result.forward.final_critique else None
-                ),
+                "final_critique": result.forward.final_critique,
                 "total_attempts": result.forward.total_attempts,
             },
             "backward": {
                 "attempts": bwd_attempts_json,
-                "final_critique": (
-                    result.backward.final_critique.model_dump()
-                    if result.backward.final_critique else None
-                ),
+                "final_critique": result.backward.final_critique,
                 "total_attempts": result.backward.total_attempts,
             },
         },
@@ -250,14 +278,14 @@ def _save_debug_output(
             "world_id": scene_result.world_id if scene_result else None,
             "world_marble_url": scene_result.world_marble_url if scene_result else None,
             "thumbnail_url": scene_result.thumbnail_url if scene_result else None,
-            "viewer_data": scene_result.viewer_data.model_dump() if scene_result else None,
+            "viewer_data": scene_result.viewer_data if scene_result else None,
         } if scene_result or text_prompt_3d else None,
     }
 
-    json_path = os.path.join(output_dir, f"{username}_{timestamp}.json")
+    json_path = os.path.join(output_dir, f"{file_prefix}.json")
     try:
-        with open(json_path, "w") as f:
-            json.dump(debug_data, f, indent=2, ensure_ascii=False)
+        with open(json_path, "wb") as f:
+            f.write(pydantic_core.to_json(debug_data, indent=2))
         logger.info("Saved debug output to %s", json_path)
     except Exception:
         logger.error("Failed to save debug output", exc_info=True)
@@ -7,15 +7,18 @@ objects, scene info, people, emotional weight, and frame-worthiness.
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
+from collections import OrderedDict
 
-import httpx
 from google.genai import types
 
 from app.services.gemini_client import (
     FLASH_MODEL,
     download_images,
+    flash_slot,
     get_gemini_client,
+    prepare_image_part,
 )
 from app.services.models import Post, PostAnalysis, PostAnalysisWithMeta
 
@@ -53,7 +56,18 @@ If this is a video thumbnail, analyze whatever is visible in the still frame.
 If multiple images are provided (carousel post), analyze them holistically as a single post.
 """
 
-_CONCURRENCY_LIMIT = 5
+# Gemini bills images above 384px per 768×768 tile; object/scene extraction
+# doesn't need more than one tile's worth of detail.
+_ANALYSIS_IMAGE_MAX_SIZE = (768, 768)
+
+# Matches the scraper's 10-post cap, so a full profile is analyzed in one wave
+_CONCURRENCY_LIMIT = 10
+
+# Content digest (image bytes + filled-in prompt) → analysis, so re-running
+# a user only sends new or edited posts to Gemini. Keyed on downloaded bytes
+# rather than URLs because Instagram CDN URLs are re-signed on every scrape.
+_ANALYSIS_CACHE_MAX_ENTRIES = 512
+_analysis_cache: OrderedDict[bytes, PostAnalysis] = OrderedDict()
 
 
 async def analyze_posts(posts: list[Post]) -> list[PostAnalysisWithMeta]:
@@ -61,18 +75,29 @@ async def analyze_posts(posts: list[Post]) -> list[PostAnalysisWithMeta]:
     if not posts:
         return []
 
-    sem = asyncio.Semaphore(_CONCURRENCY_LIMIT)
+    # Fetch every post's images up front in one batch on the shared pooled
+    # client, so downloads aren't throttled by the Gemini concurrency limit.
+    downloaded = await download_images(
+        [url for post in posts for url in post.image_urls]
+    )
+    # Split the flat result back into per-post lists by offset
+    post_images: list[list[bytes | None]] = []
+    start = 0
+    for post in posts:
+        end = start + len(post.image_urls)
+        post_images.append(downloaded[start:end])
+        start = end
 
-    async with httpx.AsyncClient(timeout=30.0) as http_client:
+    sem = asyncio.Semaphore(_CONCURRENCY_LIMIT)
 
-        async def _analyze_one(idx: int, post: Post) -> PostAnalysisWithMeta | None:
-            async with sem:
-                return await _analyze_single_post(idx, post, http_client)
+    async def _analyze_one(idx: int, post: Post) -> PostAnalysisWithMeta | None:
+        async with sem:
+            return await _analyze_single_post(idx, post, post_images[idx])
 
-        results = await asyncio.gather(
-            *[_analyze_one(i, p) for i, p in enumerate(posts)],
-            return_exceptions=True,
-        )
+    results = await asyncio.gather(
+        *[_analyze_one(i, p) for i, p in enumerate(posts)],
+        return_exceptions=True,
+    )
 
     successes: list[PostAnalysisWithMeta] = []
     for i, result in enumerate(results):
@@ -92,9 +117,9 @@ async def analyze_posts(posts: list[Post]) -> list[PostAnalysisWithMeta]:
 async def _analyze_single_post(
     index: int,
     post: Post,
-    http_client: httpx.AsyncClient,
+    image_bytes_list: list[bytes | None],
 ) -> PostAnalysisWithMeta | None:
-    """Analyze a single post with Gemini Flash."""
+    """Analyze a single post with Gemini Flash, given its downloaded images."""
     # Determine which images to send
     image_urls = post.image_urls or []
     if not image_urls and post.video_url:
@@ -104,8 +129,6 @@ async def _analyze_single_post(
         logger.warning("Post #%d has no images, skipping", index)
         return None
 
-    # Download images
-    image_bytes_list = await download_images(image_urls, client=http_client)
     valid_images = [b for b in image_bytes_list if b is not None]
     if not valid_images:
         logger.warning("Post #%d: all image downloads failed, skipping", index)
@@ -118,23 +141,39 @@ async def _analyze_single_post(
         location=post.location or "(unknown)",
     )
 
+    cache_key = _analysis_cache_key(valid_images, prompt_text)
+    analysis = _analysis_cache.get(cache_key)
+    if analysis is not None:
+        _analysis_cache.move_to_end(cache_key)
+        logger.debug("Post #%d: reusing cached analysis", index)
+        return _with_meta(analysis, index, post)
+
     # Build content parts: images first, then text
-    parts: list[types.Part] = []
-    for img_bytes in valid_images:
-        parts.append(types.Part.from_bytes(data=img_bytes, mime_type="image/jpeg"))
+    image_parts = await asyncio.gather(
+        *(
+            asyncio.to_thread(prepare_image_part, b, _ANALYSIS_IMAGE_MAX_SIZE, 85)
+            for b in valid_images
+        )
+    )
+    # Images PIL can't decode go through unchanged for Gemini to handle
+    parts = [
+        part or types.Part.from_bytes(data=b, mime_type="image/jpeg")
+        for part, b in zip(image_parts, valid_images)
+    ]
     parts.append(types.Part.from_text(text=prompt_text))
 
     # Call Gemini Flash with structured JSON output
     client = get_gemini_client()
-    response = await client.aio.models.generate_content(
-        model=FLASH_MODEL,
-        contents=parts,
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_schema=PostAnalysis,
-            temperature=0.3,
-        ),
-    )
+    async with flash_slot():
+        response = await client.aio.models.generate_content(
+            model=FLASH_MODEL,
+            contents=parts,
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=PostAnalysis,
+                temperature=0.3,
+            ),
+        )
 
     # Parse the response
     raw_text = response.text
@@ -144,6 +183,25 @@ async def _analyze_single_post(
 
     analysis = PostAnalysis.model_validate_json(raw_text)
 
+    _analysis_cache[cache_key] = analysis
+    while len(_analysis_cache) > _ANALYSIS_CACHE_MAX_ENTRIES:
+        _analysis_cache.popitem(last=False)
+
+    return _with_meta(analysis, index, post)
+
+
+def _analysis_cache_key(images: list[bytes], prompt_text: str) -> bytes:
+    """Digest of everything sent to Gemini for one post."""
+    h = hashlib.blake2b(digest_size=16)
+    for img in images:
+        h.update(len(img).to_bytes(8, "little"))
+        h.update(img)
+    h.update(prompt_text.encode())
+    return h.digest()
+
+
+def _with_meta(analysis: PostAnalysis, index: int, post: Post) -> PostAnalysisWithMeta:
+    # Likes and position change between scrapes; take them from the current post
     return PostAnalysisWithMeta(
         analysis=analysis,
         post_index=index,
@@ -3,28 +3,29 @@
 When dual_view=True (default):
   Builds TWO image generation prompts (forward + backward) step by step:
   1. Full-room layout planning (single VLM call — distributes objects across both views)
-  2. Object detail descriptions (parallel VLM calls — one per view)
-  3. Final prompt assembly (parallel VLM calls — one per view)
-  Five VLM calls total (steps 2+3 run in parallel per viewpoint).
+  2. Object details + final prompt assembly (parallel VLM calls — one per view)
+  Three VLM calls total.
 
 When dual_view=False:
   Builds a SINGLE image generation prompt with all objects in one view:
   1. Single-view layout planning (1 VLM call)
-  2. Object detail descriptions (1 VLM call)
-  3. Final prompt assembly (1 VLM call)
-  Three VLM calls total.
+  2. Object details + final prompt assembly (1 VLM call)
+  Two VLM calls total.
 """
 
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
 import re
+from collections import OrderedDict
 
+import pydantic_core
 from google.genai import types
 from pydantic import BaseModel, Field
 
-from app.services.gemini_client import FLASH_MODEL, get_gemini_client
+from app.services.gemini_client import FLASH_MODEL, flash_slot, get_gemini_client
 from app.services.models import (
     AggregatedProfile,
     ImageGenPrompt,
@@ -35,6 +36,7 @@ from app.services.models import (
 logger = logging.getLogger(__name__)
 
 _MAX_REFERENCE_IMAGES = 14  # Gemini image generation limit
+_TOKEN_SPLIT_RE = re.compile(r"[\s_\-]+")
 
 
 # ---------------------------------------------------------------------------
@@ -54,8 +56,9 @@ class _FullRoomLayoutResponse(BaseModel):
     backward_objects: list[str] = Field(default_factory=list)
 
 
-class _ObjectDetailsResponse(BaseModel):
+class _ViewBundleResponse(BaseModel):
     object_details: list[ObjectDetail] = Field(default_factory=list)
+    final_prompt: str = ""
 
 
 class _ViewLayout:
@@ -65,13 +68,17 @@ class _ViewLayout:
         self,
         camera_direction: str,
         object_names: list[str],
-        all_placements: list[str],
+        placements: list[tuple[str, str, frozenset[str]]],
     ) -> None:
         self.camera_direction = camera_direction
         self.object_names = object_names
+        name_tokens = _name_token_sets(object_names)
+        self.lower_names = frozenset(name_lower for name_lower, _ in name_tokens)
         self.object_placements = [
-            p for p in all_placements
-            if _placement_matches_objects(p, object_names)
+            placement for placement, prefix, prefix_tokens in placements
+            if _placement_matches_objects(
+                prefix, prefix_tokens, self.lower_names, name_tokens,
+            )
         ]
 
 
@@ -79,6 +86,13 @@ class _ViewLayout:
 # Public API
 # ---------------------------------------------------------------------------
 
+# Profile fingerprint → running design task, so identical concurrent requests
+# share one set of Gemini calls instead of each making their own.
+_inflight_designs: dict[
+    str, asyncio.Task[tuple[ImageGenPrompt, ImageGenPrompt | None]]
+] = {}
+
+
 async def design_prompt(
     profile: AggregatedProfile,
     *,
@@ -86,9 +100,28 @@ async def design_prompt(
 ) -> tuple[ImageGenPrompt, ImageGenPrompt | None]:
     """Design image generation prompts.
 
-    When dual_view=True (default): 5 VLM calls, returns (forward_prompt, backward_prompt).
-    When dual_view=False: 3 VLM calls, returns (forward_prompt, None).
+    When dual_view=True (default): 3 VLM calls, returns (forward_prompt, backward_prompt).
+    When dual_view=False: 2 VLM calls, returns (forward_prompt, None).
+    Concurrent calls with an identical profile await the same in-flight run.
     """
+    key = hashlib.sha256(pydantic_core.to_json([profile, dual_view])).hexdigest()
+    task = _inflight_designs.get(key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.create_task(_design_prompt(profile, dual_view))
+        _inflight_designs[key] = task
+        task.add_done_callback(
+            lambda t: _inflight_designs.pop(key) if _inflight_designs.get(key) is t else None
+        )
+    else:
+        logger.info("Stage 3: Joining in-flight prompt design for identical profile")
+    # Shielded so one caller's cancellation doesn't cancel the others' run
+    return await asyncio.shield(task)
+
+
+async def _design_prompt(
+    profile: AggregatedProfile,
+    dual_view: bool,
+) -> tuple[ImageGenPrompt, ImageGenPrompt | None]:
     # Step 1: Layout planning
     layout = await _plan_layout(profile, dual_view=dual_view)
 
@@ -102,7 +135,7 @@ async def _design_single_view(
     profile: AggregatedProfile,
     layout: _FullRoomLayoutResponse,
 ) -> tuple[ImageGenPrompt, None]:
-    """Single-view path: all objects in one forward view (3 VLM calls total)."""
+    """Single-view path: all objects in one forward view (2 VLM calls total)."""
     # Ensure all objects land in forward_objects
     if not layout.forward_objects:
         layout.forward_objects = [o.name for o in profile.key_objects]
@@ -111,20 +144,12 @@ async def _design_single_view(
     fwd_view = _ViewLayout(
         camera_direction=layout.camera_direction_forward,
         object_names=layout.forward_objects,
-        all_placements=layout.object_placements,
+        placements=_placement_prefixes(layout.object_placements),
     )
 
-    # Step 2: Object detail descriptions (1 call)
-    fwd_details = await _describe_objects(profile, layout, fwd_view)
-
-    # Build reference images
-    fwd_urls, fwd_mapping = _build_reference_images_for_view(
-        profile, fwd_view.object_names,
-    )
-
-    # Step 3: Final prompt assembly (1 call)
-    fwd_prompt_text = await _assemble_final_prompt(
-        profile, layout, fwd_view, fwd_details, fwd_mapping,
+    # Step 2: Object details + final prompt assembly (1 call)
+    fwd_details, fwd_urls, fwd_mapping, fwd_prompt_text = await _design_view_prompt(
+        profile, layout, fwd_view, _reference_candidates(profile),
     )
 
     shared_layout = LayoutPlan(
@@ -155,7 +180,7 @@ async def _design_dual_view(
     profile: AggregatedProfile,
     layout: _FullRoomLayoutResponse,
 ) -> tuple[ImageGenPrompt, ImageGenPrompt]:
-    """Dual-view path: forward + backward views (5 VLM calls total)."""
+    """Dual-view path: forward + backward views (3 VLM calls total)."""
     # Fallback: if LLM returned empty object lists, split by alternating rank
     if not layout.forward_objects and not layout.backward_objects:
         all_names = [o.name for o in profile.key_objects]
@@ -179,35 +204,26 @@ async def _design_dual_view(
         layout.forward_objects = layout.forward_objects[:half]
         logger.warning("LLM returned empty backward_objects — rebalanced split")
 
+    placements = _placement_prefixes(layout.object_placements)
     fwd_view = _ViewLayout(
         camera_direction=layout.camera_direction_forward,
         object_names=layout.forward_objects,
-        all_placements=layout.object_placements,
+        placements=placements,
     )
     bwd_view = _ViewLayout(
         camera_direction=layout.camera_direction_backward,
         object_names=layout.backward_objects,
-        all_placements=layout.object_placements,
-    )
-
-    # Step 2: Object detail descriptions (parallel)
-    fwd_details, bwd_details = await asyncio.gather(
-        _describe_objects(profile, layout, fwd_view),
-        _describe_objects(profile, layout, bwd_view),
-    )
-
-    # Build per-view reference images
-    fwd_urls, fwd_mapping = _build_reference_images_for_view(
-        profile, fwd_view.object_names,
-    )
-    bwd_urls, bwd_mapping = _build_reference_images_for_view(
-        profile, bwd_view.object_names,
+        placements=placements,
     )
 
-    # Step 3: Final prompt assembly (parallel)
-    fwd_prompt_text, bwd_prompt_text = await asyncio.gather(
-        _assemble_final_prompt(profile, layout, fwd_view, fwd_details, fwd_mapping),
-        _assemble_final_prompt(profile, layout, bwd_view, bwd_details, bwd_mapping),
+    # Step 2: one call per view, both views in parallel
+    candidates = _reference_candidates(profile)
+    (
+        (fwd_details, fwd_urls, fwd_mapping, fwd_prompt_text),
+        (bwd_details, bwd_urls, bwd_mapping, bwd_prompt_text),
+    ) = await asyncio.gather(
+        _design_view_prompt(profile, layout, fwd_view, candidates),
+        _design_view_prompt(profile, layout, bwd_view, candidates),
     )
 
     shared_layout = LayoutPlan(
@@ -241,61 +257,112 @@ async def _design_dual_view(
     return forward_prompt, backward_prompt
 
 
+async def _design_view_prompt(
+    profile: AggregatedProfile,
+    layout: _FullRoomLayoutResponse,
+    view: _ViewLayout,
+    ref_candidates: list[tuple[str, str, str]],
+) -> tuple[list[ObjectDetail], list[str], dict[int, str], str]:
+    """Step 2 for one view: reference images, then object details + final prompt.
+
+    The reference mapping depends only on the view's object names, so it is
+    built first and handed to the single fused VLM call.
+    """
+    urls, mapping = _build_reference_images_for_view(ref_candidates, view.lower_names)
+    bundle = await _describe_and_assemble(profile, layout, view, mapping)
+    return bundle.object_details, urls, mapping, bundle.final_prompt.strip()
+
+
 # ---------------------------------------------------------------------------
 # Reference image strategy
 # ---------------------------------------------------------------------------
 
+def _reference_candidates(profile: AggregatedProfile) -> list[tuple[str, str, str]]:
+    """Return (name, lower-cased name, source URL) for key objects that have a source image.
+
+    Built once per design run and partitioned per view.
+    """
+    return [
+        (o.name, o.name.lower(), o.source_image_url)
+        for o in profile.key_objects
+        if o.source_image_url
+    ]
+
+
 def _build_reference_images_for_view(
-    profile: AggregatedProfile,
-    visible_names: list[str],
+    candidates: list[tuple[str, str, str]],
+    lower_names: frozenset[str],
 ) -> tuple[list[str], dict[int, str]]:
     """Build deduplicated reference image list filtered to this viewpoint's objects.
 
+    ``candidates`` comes from ``_reference_candidates``; ``lower_names`` is the
+    view's lower-cased object names (``_ViewLayout.lower_names``).
     Multiple objects from the same source image share one reference image number.
     Returns (urls, mapping) where mapping is {1-indexed position: comma-separated object names}.
     """
-    lower_names = {n.lower() for n in visible_names}
     urls: list[str] = []
     url_to_index: dict[str, int] = {}
     mapping: dict[int, str] = {}
 
-    for obj in profile.key_objects:
-        if obj.name.lower() not in lower_names:
+    for name, name_lower, url in candidates:
+        if name_lower not in lower_names:
             continue
-        if not obj.source_image_url:
+        idx = url_to_index.get(url)
+        if idx is not None:
+            mapping[idx] += f", {name}"
             continue
-        if obj.source_image_url in url_to_index:
-            idx = url_to_index[obj.source_image_url]
-            mapping[idx] = f"{mapping[idx]}, {obj.name}"
-        else:
-            if len(urls) >= _MAX_REFERENCE_IMAGES:
-                break
-            urls.append(obj.source_image_url)
-            idx = len(urls)
-            url_to_index[obj.source_image_url] = idx
-            mapping[idx] = obj.name
+        if len(urls) >= _MAX_REFERENCE_IMAGES:
+            break
+        urls.append(url)
+        idx = url_to_index[url] = len(urls)
+        mapping[idx] = name
 
     return urls, mapping
 
 
-def _placement_matches_objects(placement: str, names: list[str]) -> bool:
-    """Check if an object_placement string matches any of the given object names.
+def _placement_prefixes(
+    placements: list[str],
+) -> list[tuple[str, str, frozenset[str]]]:
+    """Pair each placement with its lower-cased object-name prefix and its tokens.
 
-    Object placements are formatted as "object_name: placement description".
-    Uses word-token overlap to avoid false positives from short substrings
-    (e.g. "cat" matching "catalog").
+    Computed once per layout and shared by both views.
     """
-    prefix = placement.split(":")[0].strip().lower()
-    prefix_tokens = set(_tokenize(prefix))
+    result = []
+    for placement in placements:
+        prefix = placement.split(":", 1)[0].strip().lower()
+        result.append((placement, prefix, frozenset(_tokenize(prefix))))
+    return result
+
+
+def _name_token_sets(names: list[str]) -> list[tuple[str, frozenset[str]]]:
+    """Lower-case each object name and tokenize it once for placement matching."""
+    result = []
     for name in names:
         name_lower = name.lower()
-        # Exact match (case-insensitive)
-        if prefix == name_lower:
-            return True
+        result.append((name_lower, frozenset(_tokenize(name_lower))))
+    return result
+
+
+def _placement_matches_objects(
+    prefix: str,
+    prefix_tokens: frozenset[str],
+    lower_names: frozenset[str],
+    name_tokens: list[tuple[str, frozenset[str]]],
+) -> bool:
+    """Check if an object_placement's name prefix matches any of the given object names.
+
+    Object placements are formatted as "object_name: placement description";
+    the prefix and its tokens come from ``_placement_prefixes`` and
+    ``name_tokens`` from ``_name_token_sets``. Uses word-token overlap to
+    avoid false positives from short substrings (e.g. "cat" matching "catalog").
+    """
+    # Exact match (case-insensitive)
+    if prefix in lower_names:
+        return True
+    for _, tokens in name_tokens:
         # Significant word-token overlap (> 50% of the shorter token set)
-        name_tokens = set(_tokenize(name_lower))
-        overlap = prefix_tokens & name_tokens
-        shorter = min(len(prefix_tokens), len(name_tokens))
+        overlap = prefix_tokens & tokens
+        shorter = min(len(prefix_tokens), len(tokens))
         if shorter > 0 and len(overlap) / shorter > 0.5:
             return True
     return False
@@ -303,7 +370,7 @@ def _placement_matches_objects(placement: str, names: list[str]) -> bool:
 
 def _tokenize(s: str) -> list[str]:
     """Split a name into word tokens by underscores, hyphens, and spaces."""
-    return [t for t in re.split(r"[\s_\-]+", s) if t]
+    return [t for t in _TOKEN_SPLIT_RE.split(s) if t]
 
 
 # ---------------------------------------------------------------------------
@@ -431,6 +498,18 @@ against the wall to the right"). Include ALL objects.
 """
 
 
+_LAYOUT_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=_FullRoomLayoutResponse,
+    temperature=0.6,
+)
+
+# Filled-in layout prompt → raw JSON response. The raw text is cached rather
+# than the parsed model because the design steps mutate the layout's object lists.
+_LAYOUT_CACHE_MAX_ENTRIES = 64
+_layout_cache: OrderedDict[str, str] = OrderedDict()
+
+
 async def _plan_layout(
     profile: AggregatedProfile,
     *,
@@ -456,116 +535,36 @@ async def _plan_layout(
         objects_text=objects_text or "(no specific objects)",
     )
 
+    cached = _layout_cache.get(prompt)
+    if cached is not None:
+        _layout_cache.move_to_end(prompt)
+        return _FullRoomLayoutResponse.model_validate_json(cached)
+
     client = get_gemini_client()
-    response = await client.aio.models.generate_content(
-        model=FLASH_MODEL,
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_schema=_FullRoomLayoutResponse,
-            temperature=0.6,
-        ),
-    )
+    async with flash_slot():
+        response = await client.aio.models.generate_content(
+            model=FLASH_MODEL,
+            contents=prompt,
+            config=_LAYOUT_CONFIG,
+        )
 
     raw = response.text
     if not raw:
         logger.warning("Empty layout response")
         return _FullRoomLayoutResponse()
 
-    return _FullRoomLayoutResponse.model_validate_json(raw)
-
-
-# ---------------------------------------------------------------------------
-# Step 2: Object detail descriptions (1 VLM call per view)
-# ---------------------------------------------------------------------------
-
-_OBJECT_DETAIL_PROMPT = """\
-You are describing objects in a room for an image generation prompt. The room is viewed \
-from a specific camera angle.
-
-**Camera position**: {camera_position}
-**Camera direction**: {camera_direction}
-**Room style**: {style}
-**Color palette**: {colors}
-
-**Objects and their placements**:
-{placements_text}
-
-For each object, describe how it appears FROM THE CAMERA'S PERSPECTIVE. Include:
-- name: the object name
-- placement: where it sits in the frame (left, right, center, foreground, background)
-- detailed_description: vivid, specific visual description as seen from the camera angle. \
-Include:
-  * **Material and texture**: describe tactile qualities — woven, brushed, weathered, \
-polished, knitted, glazed, worn, smooth. Be specific about materials.
-  * **Color role**: note whether this object serves as a dominant tone, an accent pop, or \
-a neutral/grounding element within the palette ({colors}).
-  * **Personal character**: describe signs of use, wear, or personality that make this \
-object feel collected over time rather than bought from a catalog. A guitar with finger \
-marks, a well-thumbed book, a mug with a faded print.
-
-IMPORTANT: If an object cannot realistically exist as a physical item in a room (e.g., wild \
-animals, natural landscapes, bodies of water), describe it as a framed photograph or artwork \
-on the wall. For example, describe "jaguar" as "a framed photograph of a jaguar" with details \
-about the frame style, print quality, and how it fits the room's aesthetic.
-
-IMPORTANT: If an object is a person or group of people, do NOT describe them as human figures. \
-Instead, describe traces of their presence — personal belongings left behind, cultural artifacts, \
-a chair pulled back, an open book, a warm drink. The room should feel recently inhabited, not occupied.
-"""
-
-
-async def _describe_objects(
-    profile: AggregatedProfile,
-    layout: _FullRoomLayoutResponse,
-    view: _ViewLayout,
-) -> list[ObjectDetail]:
-    placements = "\n".join(view.object_placements) if view.object_placements else ""
-    if not placements:
-        # Fallback: use object descriptions for the objects in this view
-        lower_names = {n.lower() for n in view.object_names}
-        obj_placements = "\n".join(
-            f"  - {o.name}: {o.description}"
-            for o in profile.key_objects
-            if o.name.lower() in lower_names
-        )
-        placements = obj_placements
-
-    colors = ", ".join(profile.atmosphere.color_palette) or "(varied)"
-
-    prompt = _OBJECT_DETAIL_PROMPT.format(
-        camera_position=layout.camera_position or "center of the room",
-        camera_direction=view.camera_direction or "looking into the room",
-        style=profile.atmosphere.style,
-        colors=colors,
-        placements_text=placements or "(no specific objects for this view)",
-    )
-
-    client = get_gemini_client()
-    response = await client.aio.models.generate_content(
-        model=FLASH_MODEL,
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_schema=_ObjectDetailsResponse,
-            temperature=0.5,
-        ),
-    )
-
-    raw = response.text
-    if not raw:
-        logger.warning("Empty object detail response")
-        return []
-
-    parsed = _ObjectDetailsResponse.model_validate_json(raw)
-    return parsed.object_details
+    result = _FullRoomLayoutResponse.model_validate_json(raw)
+    _layout_cache[prompt] = raw
+    while len(_layout_cache) > _LAYOUT_CACHE_MAX_ENTRIES:
+        _layout_cache.popitem(last=False)
+    return result
 
 
 # ---------------------------------------------------------------------------
-# Step 3: Final prompt assembly (1 VLM call per view)
+# Step 2: Object details + final prompt assembly (1 VLM call per view)
 # ---------------------------------------------------------------------------
 
-_ASSEMBLY_PROMPT = """\
+_VIEW_PROMPT = """\
 You are writing an image generation prompt for a beautifully styled room scene. The room \
 should feel like it was lovingly collected and arranged over years — personal, warm, and \
 full of character — not purchased as a matching set.
@@ -580,13 +579,29 @@ full of character — not purchased as a matching set.
 - Position: {camera_position}
 - Direction: {camera_direction}
 
-**Object details (as seen from camera)**:
-{object_details_text}
+**Objects and their placements**:
+{placements_text}
 
 **Reference images are provided for these objects** (refer to them by number):
 {ref_mapping_text}
 
-Instructions:
+Work in two parts and return both as JSON.
+
+**Part 1 — object_details**: for each object, describe how it appears FROM THE CAMERA'S \
+PERSPECTIVE. Include:
+- name: the object name
+- placement: where it sits in the frame (left, right, center, foreground, background)
+- detailed_description: vivid, specific visual description as seen from the camera angle. \
+Include:
+  * **Material and texture**: describe tactile qualities — woven, brushed, weathered, \
+polished, knitted, glazed, worn, smooth. Be specific about materials.
+  * **Color role**: note whether this object serves as a dominant tone, an accent pop, or \
+a neutral/grounding element within the palette ({colors}).
+  * **Personal character**: describe signs of use, wear, or personality that make this \
+object feel collected over time rather than bought from a catalog. A guitar with finger \
+marks, a well-thumbed book, a mug with a faded print.
+
+**Part 2 — final_prompt**: using the object details from Part 1, write the final prompt:
 - Write a vivid, photorealistic description of the room as seen from the camera angle
 - Explicitly mention each key object with its visual details
 - For objects that have reference images, say "the [object] from reference image [N]" \
@@ -596,41 +611,54 @@ material/color early in the prose. They set the mood for everything else. Walls
 plain white. Use the color palette ({colors}) to drive these choices. Then describe warm \
 lighting naturally as part of the scene, keeping the focus on the key objects.
 - Include what's visible through the window if applicable to this view
-- IMPORTANT: If any key object cannot realistically exist as a physical item in a room \
-(e.g., wild animals, natural landscapes, bodies of water, large vehicles), describe it as \
-a **framed photograph or artwork on the wall** — NOT as a literal object in the room.
-- IMPORTANT: NEVER include actual human figures in the scene. If a key object is a person \
-or group of people, represent them through **traces of their presence** — personal belongings, \
-cultural artifacts, a chair pulled away from a desk, half-finished drinks, open journals, \
-shoes by the door. The room should feel like someone just stepped out, alive with their \
-personality but empty of people.
 - Do NOT use bullet points or structured format — write flowing prose
 - Keep it under 400 words
 - IMPORTANT: The final image should look like a **magazine-quality interior photograph** — \
 visually stunning, beautifully composed, with rich colors and cinematic lighting. Think \
 Architectural Digest or Kinfolk magazine editorial shoot.
 
-Return ONLY the prompt text, nothing else.
+Rules for both parts:
+- IMPORTANT: If an object cannot realistically exist as a physical item in a room (e.g., \
+wild animals, natural landscapes, bodies of water, large vehicles), describe it as a \
+**framed photograph or artwork on the wall** — NOT as a literal object in the room. For \
+example, describe "jaguar" as "a framed photograph of a jaguar" with details about the \
+frame style, print quality, and how it fits the room's aesthetic.
+- IMPORTANT: NEVER include actual human figures in the scene. If an object is a person or \
+group of people, represent them through **traces of their presence** — personal belongings, \
+cultural artifacts, a chair pulled away from a desk, half-finished drinks, open journals, \
+shoes by the door. The room should feel like someone just stepped out, alive with their \
+personality but empty of people.
 """
 
 
-async def _assemble_final_prompt(
+_VIEW_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=_ViewBundleResponse,
+    temperature=0.7,
+)
+
+
+async def _describe_and_assemble(
     profile: AggregatedProfile,
     layout: _FullRoomLayoutResponse,
     view: _ViewLayout,
-    object_details: list[ObjectDetail],
     ref_mapping: dict[int, str],
-) -> str:
-    details_text = "\n".join(
-        f"  - {od.name}: {od.detailed_description} (placed {od.placement})"
-        for od in object_details
-    )
+) -> _ViewBundleResponse:
+    placements = "\n".join(view.object_placements) if view.object_placements else ""
+    if not placements:
+        # Fallback: use object descriptions for the objects in this view
+        obj_placements = "\n".join(
+            f"  - {o.name}: {o.description}"
+            for o in profile.key_objects
+            if o.name.lower() in view.lower_names
+        )
+        placements = obj_placements
 
     ref_text = "\n".join(
         f"  Reference image {idx}: {desc}" for idx, desc in ref_mapping.items()
     ) if ref_mapping else "  (no reference images)"
 
-    prompt = _ASSEMBLY_PROMPT.format(
+    prompt = _VIEW_PROMPT.format(
         persona=profile.persona_summary,
         style=profile.atmosphere.style,
         mood=profile.atmosphere.dominant_mood,
@@ -640,22 +668,21 @@ async def _assemble_final_prompt(
         colors=", ".join(profile.atmosphere.color_palette) or "(varied)",
         camera_position=layout.camera_position or "center of the room",
         camera_direction=view.camera_direction or "looking into the room",
-        object_details_text=details_text or "(no specific objects)",
+        placements_text=placements or "(no specific objects for this view)",
         ref_mapping_text=ref_text,
     )
 
     client = get_gemini_client()
-    response = await client.aio.models.generate_content(
-        model=FLASH_MODEL,
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            temperature=0.7,
-        ),
-    )
+    async with flash_slot():
+        response = await client.aio.models.generate_content(
+            model=FLASH_MODEL,
+            contents=prompt,
+            config=_VIEW_CONFIG,
+        )
 
     raw = response.text
     if not raw:
-        logger.warning("Empty assembly response")
-        return ""
+        logger.warning("Empty view prompt response")
+        return _ViewBundleResponse()
 
-    return raw.strip()
+    return _ViewBundleResponse.model_validate_json(raw)
@@ -1,10 +1,11 @@
 """Stage 5: 3D conversion via World Labs API (Marble)."""
 
-from .convert import WorldLabsError, convert_to_3d_scene
+from .convert import WorldLabsError, close_http_clients, convert_to_3d_scene
 from .models import ConvertToSceneRequest, ConvertToSceneResult, ViewerData
 from .prompt import generate_3d_prompt
 
 __all__ = [
+    "close_http_clients",
     "convert_to_3d_scene",
     "generate_3d_prompt",
     "ConvertToSceneRequest",
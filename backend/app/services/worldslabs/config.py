@@ -16,7 +16,8 @@ class MarbleModel(StrEnum):
 WORLDLABS_BASE_URL = "https://api.worldlabs.ai/marble/v1"
 
 # Polling configuration
-POLL_INTERVAL_SECONDS: float = 5.0
+POLL_INTERVAL_SECONDS: float = 5.0  # initial backoff ceiling
+MAX_POLL_INTERVAL_SECONDS: float = 30.0
 POLL_TIMEOUT_SECONDS: float = 600.0
 
 # Default generation prompt
@@ -7,15 +7,19 @@ Output: Gaussian splat + collider mesh + thumbnail + panorama.
 from __future__ import annotations
 
 import asyncio
+import random
 import time
 import uuid
+import weakref
 
 import httpx
 
 from .config import (
+    MAX_POLL_INTERVAL_SECONDS,
     POLL_INTERVAL_SECONDS,
     POLL_TIMEOUT_SECONDS,
     WORLDLABS_BASE_URL,
+    MarbleModel,
     get_api_key,
 )
 from .models import (
@@ -25,6 +29,7 @@ from .models import (
     GenerateWorldResponse,
     ImagePrompt,
     MultiImagePromptItem,
+    OperationResponsePayload,
     OperationStatus,
     PrepareUploadResponse,
     ViewerData,
@@ -42,13 +47,64 @@ class WorldLabsError(Exception):
 # ---------------------------------------------------------------------------
 
 
-def _build_client() -> httpx.AsyncClient:
-    """Create an httpx async client pre-configured for the Marble API."""
-    return httpx.AsyncClient(
-        base_url=WORLDLABS_BASE_URL,
-        headers={"WLT-Api-Key": get_api_key()},
-        timeout=httpx.Timeout(60.0, connect=10.0),
-    )
+# Idle connections outlive the poll interval so status polls reuse them
+_KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+# One pooled client of each kind per event loop — httpx connections are bound
+# to the loop that opened them (same scheme as gemini_client.get_http_client).
+_api_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, httpx.AsyncClient
+] = weakref.WeakKeyDictionary()
+_upload_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, httpx.AsyncClient
+] = weakref.WeakKeyDictionary()
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the pooled httpx client pre-configured for the Marble API.
+
+    Reused across conversions so prepare_upload, generate, every status poll
+    and the final world fetch ride on already-open TLS connections. HTTP/2
+    lets concurrent conversions multiplex their requests over one of them.
+    """
+    loop = asyncio.get_running_loop()
+    client = _api_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=WORLDLABS_BASE_URL,
+            headers={"WLT-Api-Key": get_api_key()},
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(keepalive_expiry=_KEEPALIVE_EXPIRY_SECONDS),
+            http2=True,
+        )
+        _api_clients[loop] = client
+    return client
+
+
+def _get_upload_client() -> httpx.AsyncClient:
+    """Return the pooled bare client for signed-URL uploads.
+
+    The signed URL is a third-party host (e.g. S3/GCS) and we must NOT send
+    the WLT-Api-Key header there, so uploads use a separate client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _upload_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(120.0),
+            limits=httpx.Limits(keepalive_expiry=_KEEPALIVE_EXPIRY_SECONDS),
+        )
+        _upload_clients[loop] = client
+    return client
+
+
+async def close_http_clients() -> None:
+    """Close the running event loop's World Labs clients, if any."""
+    loop = asyncio.get_running_loop()
+    for clients in (_api_clients, _upload_clients):
+        client = clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
 
 
 async def _upload_image(
@@ -72,17 +128,15 @@ async def _upload_image(
         json={"file_name": filename, "kind": "image", "extension": extension},
     )
     resp.raise_for_status()
-    upload = PrepareUploadResponse.model_validate(resp.json())
-
-    # Use a bare client for the PUT — the signed URL is a third-party
-    # host (e.g. S3/GCS) and we must NOT send the WLT-Api-Key header there.
-    async with httpx.AsyncClient(timeout=httpx.Timeout(120.0)) as upload_client:
-        put_resp = await upload_client.put(
-            upload.upload_info.upload_url,
-            content=image_bytes,
-            headers=upload.upload_info.required_headers,
-        )
-        put_resp.raise_for_status()
+    upload = PrepareUploadResponse.model_validate_json(resp.content)
+
+    # Bare client for the PUT — no Marble API key on the third-party host
+    put_resp = await _get_upload_client().put(
+        upload.upload_info.upload_url,
+        content=image_bytes,
+        headers=upload.upload_info.required_headers,
+    )
+    put_resp.raise_for_status()
 
     return upload.media_asset.media_asset_id
 
@@ -154,80 +208,103 @@ async def _submit_generation(
         seed=request.seed,
     )
 
+    # Serialize straight to JSON bytes in pydantic-core instead of via a dict
     resp = await client.post(
         "/worlds:generate",
-        json=body.model_dump(exclude_none=True),
+        content=body.model_dump_json(exclude_none=True),
+        headers={"Content-Type": "application/json"},
     )
     resp.raise_for_status()
-    return GenerateWorldResponse.model_validate(resp.json()).operation_id
+    return GenerateWorldResponse.model_validate_json(resp.content).operation_id
 
 
-async def _poll_operation(client: httpx.AsyncClient, operation_id: str) -> str:
-    """Poll an operation until completion and return the ``world_id``.
+# MarbleModel → smoothed submit-to-done time (seconds) of recent conversions
+_GENERATION_TIME_SMOOTHING = 0.3
+_generation_times: dict[MarbleModel, float] = {}
 
-    Raises ``TimeoutError`` after ``POLL_TIMEOUT_SECONDS`` and
-    ``RuntimeError`` if the API reports an error.
+
+def _record_generation_time(model: MarbleModel, seconds: float) -> None:
+    """Fold a completed job's duration into the model's moving average."""
+    previous = _generation_times.get(model)
+    if previous is None:
+        _generation_times[model] = seconds
+    else:
+        _generation_times[model] = (
+            _GENERATION_TIME_SMOOTHING * seconds
+            + (1 - _GENERATION_TIME_SMOOTHING) * previous
+        )
+
+
+async def _poll_operation(
+    client: httpx.AsyncClient,
+    operation_id: str,
+    initial_wait: float = 0.0,
+) -> OperationResponsePayload:
+    """Poll an operation until completion and return its response payload.
+
+    The first poll is delayed by ``initial_wait`` seconds. Waits between
+    polls use truncated exponential backoff with full jitter: a random delay
+    up to a ceiling that starts at ``POLL_INTERVAL_SECONDS`` and doubles up
+    to ``MAX_POLL_INTERVAL_SECONDS``. Short jobs are picked up quickly, long
+    ones poll less often, and concurrent pollers spread out.
+
+    Raises ``TimeoutError`` after ``POLL_TIMEOUT_SECONDS`` — a hard bound,
+    cancelling any poll still in flight — and ``RuntimeError`` if the API
+    reports an error.
     """
-    deadline = time.monotonic() + POLL_TIMEOUT_SECONDS
-
-    while True:
-        resp = await client.get(f"/operations/{operation_id}")
-        resp.raise_for_status()
-        status = OperationStatus.model_validate(resp.json())
-
-        if status.done:
-            if status.error:
-                raise RuntimeError(
-                    f"World generation failed: "
-                    f"{status.error.code} — {status.error.message}"
-                )
-            if status.response is None:
-                raise RuntimeError(
-                    "Operation completed but response payload is missing"
-                )
-            return status.response.world_id
-
-        if time.monotonic() >= deadline:
-            raise TimeoutError(
-                f"World generation timed out after {POLL_TIMEOUT_SECONDS}s "
-                f"(operation {operation_id})"
-            )
+    backoff = POLL_INTERVAL_SECONDS
 
-        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+    try:
+        async with asyncio.timeout(POLL_TIMEOUT_SECONDS):
+            await asyncio.sleep(initial_wait)
+            while True:
+                resp = await client.get(f"/operations/{operation_id}")
+                resp.raise_for_status()
+                status = OperationStatus.model_validate_json(resp.content)
+
+                if status.done:
+                    if status.error:
+                        raise RuntimeError(
+                            f"World generation failed: "
+                            f"{status.error.code} — {status.error.message}"
+                        )
+                    if status.response is None:
+                        raise RuntimeError(
+                            "Operation completed but response payload is missing"
+                        )
+                    return status.response
+
+                await asyncio.sleep(random.uniform(0, backoff))
+                backoff = min(backoff * 2, MAX_POLL_INTERVAL_SECONDS)
+    except TimeoutError:
+        raise TimeoutError(
+            f"World generation timed out after {POLL_TIMEOUT_SECONDS}s "
+            f"(operation {operation_id})"
+        ) from None
 
 
 async def _get_world(client: httpx.AsyncClient, world_id: str) -> World:
     """Fetch the full world object including asset URLs."""
     resp = await client.get(f"/worlds/{world_id}")
     resp.raise_for_status()
-    return World.model_validate(resp.json())
+    return World.model_validate_json(resp.content)
 
 
 def _build_result(world: World) -> ConvertToSceneResult:
     """Map a ``World`` response to the pipeline output models."""
+    assets = world.assets
     # Pick best available splat URL: full_res > 500k > 100k
-    splat_url: str | None = None
-    if world.assets and world.assets.splats and world.assets.splats.spz_urls:
-        spz = world.assets.splats.spz_urls
-        splat_url = spz.full_res or spz.splat_500k or spz.splat_100k
+    spz = assets.splats.spz_urls if assets and assets.splats else None
+    splat_url = spz and (spz.full_res or spz.splat_500k or spz.splat_100k)
 
     if not splat_url:
         raise WorldLabsError(
             f"World {world.world_id} has no splat download URLs"
         )
 
-    collider_url = (
-        world.assets.mesh.collider_mesh_url
-        if world.assets and world.assets.mesh else None
-    )
-    panorama_url = (
-        world.assets.imagery.pano_url
-        if world.assets and world.assets.imagery else None
-    )
-    thumbnail_url = (
-        world.assets.thumbnail_url
-        if world.assets else None
-    )
+    # A splat URL implies assets is present from here on
+    collider_url = assets.mesh.collider_mesh_url if assets.mesh else None
+    panorama_url = assets.imagery.pano_url if assets.imagery else None
 
     viewer_data = ViewerData(
         splat_url=splat_url,
@@ -239,7 +316,7 @@ def _build_result(world: World) -> ConvertToSceneResult:
         viewer_data=viewer_data,
         world_id=world.world_id,
         world_marble_url=world.world_marble_url,
-        thumbnail_url=thumbnail_url,
+        thumbnail_url=assets.thumbnail_url,
     )
 
 
@@ -267,31 +344,51 @@ async def convert_to_3d_scene(
         )
 
     try:
-        async with _build_client() as client:
-            media_asset_id: str | None = None
-            media_asset_ids: list[str] | None = None
-
-            if has_multi:
-                # Multi-image: upload both in parallel
-                view_labels = ("fwd", "bwd")
-                upload_tasks = [
-                    _upload_image(client, img_bytes, f"instaroom-{view_labels[i]}.png")
-                    for i, img_bytes in enumerate(request.image_bytes_list[:2])
-                ]
-                media_asset_ids = await asyncio.gather(*upload_tasks)
-            elif request.image_bytes:
-                media_asset_id = await _upload_image(client, request.image_bytes)
-
-            # Submit generation
-            operation_id = await _submit_generation(
-                client, request, media_asset_id, media_asset_ids,
-            )
-
-            # Poll until done
-            world_id = await _poll_operation(client, operation_id)
+        client = _get_client()
+        media_asset_id: str | None = None
+        media_asset_ids: list[str] | None = None
+
+        if has_multi:
+            # Multi-image: upload both in parallel; a failed upload cancels the other
+            view_labels = ("fwd", "bwd")
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    upload_tasks = [
+                        tg.create_task(_upload_image(
+                            client, img_bytes, f"instaroom-{view_labels[i]}.png",
+                        ))
+                        for i, img_bytes in enumerate(request.image_bytes_list[:2])
+                    ]
+            except ExceptionGroup as eg:
+                # Re-raise the first failure so the handlers below map it as before
+                raise eg.exceptions[0]
+            media_asset_ids = [t.result() for t in upload_tasks]
+        elif request.image_bytes:
+            media_asset_id = await _upload_image(client, request.image_bytes)
+
+        # Submit generation
+        operation_id = await _submit_generation(
+            client, request, media_asset_id, media_asset_ids,
+        )
 
-            # Fetch world with asset URLs
-            world = await _get_world(client, world_id)
+        # Poll until done, skipping the first half of this model's usual run time
+        started = time.monotonic()
+        payload = await _poll_operation(
+            client, operation_id,
+            initial_wait=0.5 * _generation_times.get(request.model, 0.0),
+        )
+        _record_generation_time(request.model, time.monotonic() - started)
+
+        # Fetch world with asset URLs, unless the operation already embeds them
+        assets = payload.assets
+        if assets and assets.splats and assets.splats.spz_urls:
+            world = World(
+                world_id=payload.world_id,
+                world_marble_url=payload.world_marble_url,
+                assets=assets,
+            )
+        else:
+            world = await _get_world(client, payload.world_id)
 
         return _build_result(world)
 
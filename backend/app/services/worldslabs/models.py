@@ -104,10 +104,14 @@ class OperationError(BaseModel):
 
 
 class OperationResponsePayload(BaseModel):
-    """Nested response inside a completed operation."""
+    """Nested response inside a completed operation.
+
+    ``assets`` is filled when the operation embeds the generated world.
+    """
 
     world_id: str
     world_marble_url: str | None = None
+    assets: WorldAssets | None = None
 
 
 class OperationStatus(BaseModel):
@@ -162,6 +166,12 @@ class World(BaseModel):
     model: str | None = None
 
 
+# The operation models above reference WorldAssets before it is defined;
+# build their validators now rather than on the first status poll.
+OperationResponsePayload.model_rebuild()
+OperationStatus.model_rebuild()
+
+
 # ---------------------------------------------------------------------------
 # Pipeline output
 # ---------------------------------------------------------------------------
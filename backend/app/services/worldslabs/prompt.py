@@ -1,7 +1,8 @@
 """Generate a spatial 3D prompt for World Labs Marble from Stage 2/3 data.
 
-Uses Gemini Flash to write a short paragraph focusing on the room's spatial
-envelope and atmosphere — the parts NOT already captured by the image(s).
+Uses Gemini Flash-Lite (falling back to Flash) to write a short paragraph
+focusing on the room's spatial envelope and atmosphere — the parts NOT
+already captured by the image(s).
 The 3D engine already sees every object in the images; the text prompt should
 describe the surrounding space, hidden surfaces, and environmental context
 so the engine can reconstruct a coherent 3D volume.
@@ -9,12 +10,19 @@ so the engine can reconstruct a coherent 3D volume.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 
 from google.genai import types
 
-from app.services.gemini_client import FLASH_MODEL, get_gemini_client
+from app.services.gemini_client import (
+    FLASH_LITE_MODEL,
+    FLASH_MODEL,
+    flash_slot,
+    get_gemini_client,
+)
 
 from .config import DEFAULT_TEXT_PROMPT
 
@@ -67,6 +75,34 @@ muffled coziness of a small one), air quality (dusty, fresh, warm)
 Return ONLY the spatial paragraph, nothing else.
 """
 
+_DUAL_VIEW_INSTRUCTION = (
+    "5. **Between the views** — TWO images are provided (forward + "
+    "backward from the same position). Describe how the room volume "
+    "connects between the two views: the side walls, the ceiling "
+    "continuity, and any transitional space at the 90° angles that "
+    "neither camera captures."
+)
+
+# Filled-in spatial prompt → generated paragraph. Retries and re-renders of the
+# same room produce identical layout/atmosphere fields, so skip the Flash call.
+_PROMPT_CACHE_MAX_ENTRIES = 256
+_prompt_cache: OrderedDict[str, str] = OrderedDict()
+
+# A ~100-word rewrite doesn't need full Flash; retry on Flash only if Lite
+# fails, times out, or comes back empty. Each attempt is capped so a hung
+# connection costs at most two timeouts before falling back to the default.
+_SPATIAL_MODELS = (FLASH_LITE_MODEL, FLASH_MODEL)
+_SPATIAL_TIMEOUT_SECONDS = 8.0
+
+# ~100 words fits well inside 256 tokens; the cap bounds decode time if the
+# model ignores the length instruction. Thinking is off because 2.5 Flash
+# counts thought tokens against max_output_tokens.
+_SPATIAL_CONFIG = types.GenerateContentConfig(
+    temperature=0.4,
+    max_output_tokens=256,
+    thinking_config=types.ThinkingConfig(thinking_budget=0),
+)
+
 
 async def generate_3d_prompt(
     profile: AggregatedProfile,
@@ -82,51 +118,72 @@ async def generate_3d_prompt(
     """
     try:
         layout = prompt_data.layout
+        atmosphere = profile.atmosphere
+        # room_size / time_of_day always carry model defaults, so they don't
+        # tell us whether Stages 2-3 produced anything to describe.
+        if not any((
+            layout.room_shape,
+            layout.camera_position,
+            layout.camera_direction,
+            layout.window_placement,
+            atmosphere.window_view,
+        )):
+            logger.info("All 3D prompt fields are defaults, skipping Gemini call")
+            return DEFAULT_TEXT_PROMPT
+
         is_dual = bool(layout.camera_direction_back and layout.backward_objects)
 
         if is_dual:
             backward_direction_line = (
                 f"- Camera direction (backward, 180°): {layout.camera_direction_back}"
             )
-            dual_view_instruction = (
-                "5. **Between the views** — TWO images are provided (forward + "
-                "backward from the same position). Describe how the room volume "
-                "connects between the two views: the side walls, the ceiling "
-                "continuity, and any transitional space at the 90° angles that "
-                "neither camera captures."
-            )
+            dual_view_instruction = _DUAL_VIEW_INSTRUCTION
         else:
             backward_direction_line = ""
             dual_view_instruction = ""
 
         prompt = _SPATIAL_PROMPT.format(
             room_shape=layout.room_shape or "rectangular",
-            room_size=profile.atmosphere.room_size or "medium",
+            room_size=atmosphere.room_size or "medium",
             camera_position=layout.camera_position or "doorway",
             camera_direction=layout.camera_direction or "looking into the room",
             backward_direction_line=backward_direction_line,
             window_placement=layout.window_placement or "far wall",
-            window_view=profile.atmosphere.window_view or "exterior",
-            time_of_day=profile.atmosphere.time_of_day or "afternoon",
+            window_view=atmosphere.window_view or "exterior",
+            time_of_day=atmosphere.time_of_day or "afternoon",
             dual_view_instruction=dual_view_instruction,
         )
 
-        client = get_gemini_client()
-        response = await client.aio.models.generate_content(
-            model=FLASH_MODEL,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=0.4,
-            ),
-        )
+        cached = _prompt_cache.get(prompt)
+        if cached is not None:
+            _prompt_cache.move_to_end(prompt)
+            return cached
 
-        raw = response.text
-        if not raw or not raw.strip():
-            logger.warning("Empty 3D prompt response from Gemini, using default")
+        client = get_gemini_client()
+        for model in _SPATIAL_MODELS:
+            try:
+                async with flash_slot(), asyncio.timeout(_SPATIAL_TIMEOUT_SECONDS):
+                    response = await client.aio.models.generate_content(
+                        model=model,
+                        contents=prompt,
+                        config=_SPATIAL_CONFIG,
+                    )
+            except Exception:
+                logger.warning("3D prompt call to %s failed", model, exc_info=True)
+                continue
+            raw = response.text
+            if raw and raw.strip():
+                break
+            logger.warning("Empty 3D prompt response from %s", model)
+        else:
+            logger.warning("No 3D prompt from Gemini, using default")
             return DEFAULT_TEXT_PROMPT
 
         result = raw.strip()
         logger.info("Generated 3D spatial prompt (%d chars)", len(result))
+        _prompt_cache[prompt] = result
+        while len(_prompt_cache) > _PROMPT_CACHE_MAX_ENTRIES:
+            _prompt_cache.popitem(last=False)
         return result
 
     except Exception:
@@ -0,0 +1,161 @@
+"""Username job registry: dedup, retry after failure, and scrape retries.
+
+Pure in-process logic — the scrape and pipeline calls are stubbed, so no API
+keys are needed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.services import jobs
+from app.services.crawler.scraper import (
+    ProfileUnavailableError,
+    ScrapeResult,
+    ScraperRunError,
+)
+from app.services.jobs import (
+    JobStatus,
+    find_username_job,
+    get_completed_username_job,
+    start_username_job,
+)
+from app.services.models import AggregatedProfile
+from app.services.worldslabs.models import ConvertToSceneResult, ViewerData
+
+
+@pytest.fixture(autouse=True)
+def _isolated_registry(monkeypatch):
+    """Give each test an empty job registry and a stubbed scrape."""
+    monkeypatch.setattr(jobs, "_jobs", {})
+    monkeypatch.setattr(jobs, "_active_by_username", {})
+    monkeypatch.setattr(jobs, "_completed_by_username", {})
+
+    async def _scrape(username: str) -> ScrapeResult:
+        return ScrapeResult.model_construct(profile=None, posts=[])
+
+    monkeypatch.setattr(jobs, "scrape_profile", _scrape)
+
+
+def _stub_pipeline(monkeypatch, scene_result: ConvertToSceneResult | None) -> None:
+    profile = AggregatedProfile.model_construct(persona_summary="A traveller")
+
+    async def _run_pipeline(crawl_result, **kwargs):
+        return None, profile, scene_result
+
+    monkeypatch.setattr(jobs, "run_pipeline", _run_pipeline)
+
+
+async def _finish(job) -> None:
+    """Wait for the background task of ``job`` to finish."""
+    while job.status not in (JobStatus.COMPLETED, JobStatus.FAILED):
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_in_flight_job_is_shared(monkeypatch):
+    """A second request for the same username finds the running job."""
+    _stub_pipeline(monkeypatch, None)
+    gate = asyncio.Event()
+
+    async def _slow_scrape(username: str) -> ScrapeResult:
+        await gate.wait()
+        return ScrapeResult.model_construct(profile=None, posts=[])
+
+    monkeypatch.setattr(jobs, "scrape_profile", _slow_scrape)
+    job = start_username_job("@NatGeo")
+    await asyncio.sleep(0)
+    assert find_username_job("natgeo") is job
+
+    gate.set()
+    await _finish(job)
+
+
+@pytest.mark.asyncio
+async def test_completed_job_is_reused(monkeypatch):
+    """A job that produced a scene is returned for later requests."""
+    scene = ConvertToSceneResult(
+        viewer_data=ViewerData(splat_url="https://example.com/scene.spz"),
+        world_id="world-1",
+    )
+    _stub_pipeline(monkeypatch, scene)
+
+    job = start_username_job("natgeo")
+    await _finish(job)
+
+    assert job.status == JobStatus.COMPLETED
+    assert job.result["room_id"] == "world-1"
+    assert find_username_job("@NatGeo") is job
+    assert get_completed_username_job("natgeo") is job
+
+
+@pytest.mark.asyncio
+async def test_job_without_scene_fails_and_allows_retry(monkeypatch):
+    """A swallowed Stage 5 failure fails the job instead of pinning ``room_id: None``."""
+    _stub_pipeline(monkeypatch, None)
+
+    job = start_username_job("natgeo")
+    await _finish(job)
+
+    assert job.status == JobStatus.FAILED
+    assert job.error == {"message": "3D scene conversion failed", "stage": 5}
+    assert find_username_job("natgeo") is None
+    assert get_completed_username_job("natgeo") is None
+
+    retry = start_username_job("natgeo")
+    assert retry.job_id != job.job_id
+    assert find_username_job("natgeo") is retry
+    await _finish(retry)
+
+
+def _counting_scrape(monkeypatch, exc: Exception) -> list[str]:
+    """Stub scrape_profile to always raise ``exc``; return the call log."""
+    calls: list[str] = []
+
+    async def _scrape(username: str) -> ScrapeResult:
+        calls.append(username)
+        raise exc
+
+    monkeypatch.setattr(jobs, "scrape_profile", _scrape)
+    monkeypatch.setattr(jobs, "_SCRAPE_RETRY_BACKOFF_SECONDS", 0.0)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_unavailable_profile_fails_without_retry(monkeypatch):
+    """A private or empty profile fails the job on the first Apify run."""
+    calls = _counting_scrape(monkeypatch, ProfileUnavailableError("private"))
+
+    job = start_username_job("natgeo")
+    await _finish(job)
+
+    assert job.status == JobStatus.FAILED
+    assert job.error == {"message": "private", "stage": 0}
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_permanent_scraper_error_is_not_retried(monkeypatch):
+    """Non-retryable HTTP errors (e.g. 401) are not retried."""
+    calls = _counting_scrape(monkeypatch, ScraperRunError("401", transient=False))
+
+    job = start_username_job("natgeo")
+    await _finish(job)
+
+    assert job.status == JobStatus.FAILED
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_transient_scraper_error_is_retried(monkeypatch):
+    """Network errors, 429 and 5xx are retried up to the limit."""
+    calls = _counting_scrape(monkeypatch, ScraperRunError("503", transient=True))
+
+    job = start_username_job("natgeo")
+    await _finish(job)
+
+    assert job.status == JobStatus.FAILED
+    assert len(calls) == jobs._SCRAPE_MAX_RETRIES + 1
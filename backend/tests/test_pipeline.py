@@ -18,6 +18,7 @@ import json
 import logging
 import os
 import tempfile
+from functools import lru_cache
 from pathlib import Path
 
 import pytest
@@ -47,12 +48,14 @@ FIXTURES_DIR = Path(__file__).parent / "fixtures"
 # Helpers
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=1)
 def _load_fixture() -> ScrapeResult:
-    """Load the natgeo parsed fixture as a ScrapeResult."""
+    """Load the natgeo parsed fixture as a ScrapeResult.
+
+    Parsed once and shared across tests — the pipeline only reads it.
+    """
     fixture_path = FIXTURES_DIR / "natgeo_parsed.json"
-    with open(fixture_path) as f:
-        data = json.load(f)
-    return ScrapeResult.model_validate(data)
+    return ScrapeResult.model_validate_json(fixture_path.read_bytes())
 
 
 def _require_google_api_key():
@@ -167,7 +170,7 @@ async def test_full_pipeline():
 
         # --- Stage 4 forward checks ---
         fwd = result.forward
-        assert fwd.final_image_base64, "No forward image generated"
+        assert fwd.final_image_bytes, "No forward image generated"
         assert fwd.total_attempts > 0, "Forward has 0 attempts"
         assert fwd.final_critique is not None, "Forward has no critique"
         logger.info(
@@ -177,7 +180,7 @@ async def test_full_pipeline():
 
         # --- Stage 4 backward checks ---
         bwd = result.backward
-        assert bwd.final_image_base64, "No backward image generated"
+        assert bwd.final_image_bytes, "No backward image generated"
         assert bwd.total_attempts > 0, "Backward has 0 attempts"
         assert bwd.final_critique is not None, "Backward has no critique"
         logger.info(
@@ -187,7 +190,19 @@ async def test_full_pipeline():
 
         # --- Debug output checks ---
         output_files = os.listdir(tmpdir)
-        json_files = [f for f in output_files if f.endswith(".json")]
+        json_files: list[str] = []
+        png_files: list[str] = []
+        fwd_pngs: list[str] = []
+        bwd_pngs: list[str] = []
+        for name in output_files:
+            if name.endswith(".json"):
+                json_files.append(name)
+            elif name.endswith(".png"):
+                png_files.append(name)
+                if "_forward_" in name:
+                    fwd_pngs.append(name)
+                if "_backward_" in name:
+                    bwd_pngs.append(name)
         assert len(json_files) == 1, f"Expected 1 debug JSON, got {json_files}"
 
         # Check debug JSON structure
@@ -205,9 +220,6 @@ async def test_full_pipeline():
         assert "backward" in debug["stage_4_result"]
 
         # Check image files saved with correct prefixes
-        png_files = [f for f in output_files if f.endswith(".png")]
-        fwd_pngs = [f for f in png_files if "_forward_" in f]
-        bwd_pngs = [f for f in png_files if "_backward_" in f]
         assert fwd_pngs, f"No forward PNG files found in {png_files}"
         assert bwd_pngs, f"No backward PNG files found in {png_files}"
 
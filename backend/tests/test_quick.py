@@ -78,12 +78,12 @@ async def main(*, dual_view: bool = True, run_3d: bool = False) -> None:
     print("\n=== PIPELINE COMPLETE ===")
     print(f"  Key objects: {[o.name for o in profile.key_objects]}")
     print(f"  Style: {profile.atmosphere.style}")
-    if fwd.final_image_base64:
+    if fwd.final_image_bytes:
         score = fwd.final_critique.avg_score if fwd.final_critique else 0
         print(f"  Forward:  {fwd.total_attempts} attempts, score={score:.2f}")
     else:
         print("  Forward:  no image generated")
-    if bwd.final_image_base64:
+    if bwd.final_image_bytes:
         score = bwd.final_critique.avg_score if bwd.final_critique else 0
         print(f"  Backward: {bwd.total_attempts} attempts, score={score:.2f}")
     else:
@@ -105,4 +105,10 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    asyncio.run(main(dual_view=not args.single_view, run_3d=args.run_3d))
+    # uvloop ships with uvicorn[standard]; fall back to the stdlib loop without it
+    try:
+        import uvloop
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
+    run(main(dual_view=not args.single_view, run_3d=args.run_3d))